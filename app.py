@@ -1,81 +1,17 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import time
-import re
-from io import BytesIO
-
-def format_rupiah(x):
-    if pd.isna(x):
-        return ""
-    # pastikan bisa diubah ke float
-    try:
-        x = float(x)
-    except:
-        return x  # biarin apa adanya kalau bukan angka
-
-    # kalau tidak punya desimal (misal 7000.0), tampilkan tanpa ,00
-    if x.is_integer():
-        formatted = f"{int(x):,}".replace(",", ".")
-    else:
-        formatted = f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        # hapus ,00 kalau desimalnya 0 semua (misal 7000,00 → 7000)
-        if formatted.endswith(",00"):
-            formatted = formatted[:-3]
-    return formatted
-
-def highlight_total(row):
-    if any(str(x).strip().upper() == "TOTAL" for x in row):
-        return ["font-weight: bold; background-color: #D9EAD3; color: #1A5E20;"] * len(row)
-    else:
-        return [""] * len(row)
-    
-def highlight_bold(row):
-    if any(str(x).strip().upper() == "TOTAL" for x in row):
-        return ["font-weight: bold;"] * len(row)
-    else:
-        return [""] * len(row)
-    
-def highlight_rank_summary(row, num_cols):
-    styles = [""] * len(row)
-
-    # Ambil nilai numeric vendor
-    numeric_vals = row[num_cols]
-
-    # EXCLUDE nilai 0 (vendor tidak ikut tender)
-    numeric_vals = numeric_vals[numeric_vals != 0]
+from functools import partial
 
-    # Skip jika kosong / NaN semua
-    if numeric_vals.dropna().empty:
-        return styles
+import profiling
+from charts import average_gap_chart, win_rate_chart
+from display import debug_sidebar, show_table
+from engine import average_gaps, win_rates
+from excel_export import (STREAM_MIN_CELLS, export_cells, frames_fingerprint, generate_multi_sheet_excel,
+                          stream_multi_sheet_excel)
+from formatting import BOLD_CSS, rupiah_formatter, style_rank, style_total, style_vendor_rank
 
-    # Sort numeric values
-    sorted_vals = numeric_vals.sort_values()
-
-    # Determine 1st & 2nd rank
-    first_vendor = sorted_vals.index[0]
-    second_vendor = sorted_vals.index[1] if len(sorted_vals) > 1 else None
-
-    # Apply styles
-    for i, col in enumerate(row.index):
-        if col == first_vendor:
-            styles[i] = "background-color: #C6EFCE; color: #006100;"
-        elif second_vendor and col == second_vendor:
-            styles[i] = "background-color: #FFEB9C; color: #9C6500;"
-
-    return styles
-
-def highlight_1st_2nd(row, columns):
-    styles = [""] * len(columns)
-    first_vendor = row.get("1st Vendor")
-    second_vendor = row.get("2nd Vendor")
-
-    for i, col in enumerate(columns):
-        if col == first_vendor:
-            styles[i] = "background-color: #C6EFCE; color: #006100;"
-        elif col == second_vendor:
-            styles[i] = "background-color: #FFEB9C; color: #9C6500;"
-    return styles
+# ?debug=1 menampilkan durasi & memori tiap tahap di sidebar
+profiling.begin_run(st.query_params.get("debug") == "1")
 
 st.markdown(
     """
@@ -380,9 +316,13 @@ st.markdown("#### What is Displayed?")
 # Path file Excel yang sudah ada
 file_path = "dummy dataset.xlsx"
 
-# Buka file sebagai binary
-with open(file_path, "rb") as f:
-    file_data = f.read()
+@st.cache_resource(show_spinner=False)
+def read_dummy_file(file_path):
+    # Buka file sebagai binary, sekali per proses
+    with open(file_path, "rb") as f:
+        return f.read()
+
+file_data = read_dummy_file(file_path)
 
 # Markdown teks
 st.markdown(
@@ -406,7 +346,7 @@ st.download_button(
     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     on_click=release_the_balloons,
     type="primary",
-    use_container_width=True,
+    width="stretch",
 )
 
 st.markdown(
@@ -418,354 +358,416 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-st.markdown("**:red-badge[1. MERGE DATA]**")
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; margin-top:-10px;">
-            The system will merge the tables from each sheet into a single table and add a 
-            <span style="background:#FFCB09; padding:2px 4px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">TOTAL ROW</span> 
-            for each vendor.
-        </div>
-    """,
-    unsafe_allow_html=True
-)
-
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
-            🛸 Original Data
-        </div>
-    """,
-    unsafe_allow_html=True
-)
+@st.cache_resource(show_spinner=False)
+def merge_demo():
+    # Tabel contoh konstan: dibangun sekali per proses, bukan di setiap rerun
+    # DataFrame
+    columns = ["VENDOR", "SCOPE TOTAL PRICE (IDR)", "REGION 1", "REGION 2", "REGION 3", "TOTAL"]
+    data = [
+        ["Vendor A", "MBTS", 800, 250, 300, 1350],
+        ["Vendor A", "Reposition", 750, 250, 260, 1260],
+        ["Vendor A", "Reroute", 1140, 380, 390, 1910],
+        ["Vendor A", "TOTAL", 2690, 880, 950, 4520],
+
+        ["Vendor B", "MBTS", 1250, 400, 450, 2100],
+        ["Vendor B", "Reposition", 650, 200, 220, 1070],
+        ["Vendor B", "Reroute", 810, 270, 280, 1360],
+        ["Vendor B", "TOTAL", 2710, 870, 950, 4530],
+
+        ["Vendor C", "MBTS", 900, 300, 320, 1520],
+        ["Vendor C", "Reposition", 980, 320, 350, 1650],
+        ["Vendor C", "Reroute", 720, 230, 240, 1190],
+        ["Vendor C", "TOTAL", 2600, 850, 910, 4360],
+    ]
+    df_merge = pd.DataFrame(data, columns=columns)
+
+    # DataFrame
+    columns = ["VENDOR", "REGION", "MBTS", "Reposition", "Reroute", "TOTAL"]
+    data = [
+        ["Vendor A", "REGION 1", 800,750,1140,2690],
+        ["Vendor A", "REGION 2", 250,250,380,880],
+        ["Vendor A", "REGION 3", 300,260,390,950],
+        ["Vendor A", "TOTAL", 1350,1260,1910,4520],
+
+        ["Vendor B", "REGION 1", 1250,650,810,2710],
+        ["Vendor B", "REGION 2", 400,200,270,870],
+        ["Vendor B", "REGION 3", 450,220,280,950],
+        ["Vendor B", "TOTAL", 2100,1070,1360,4530],
+
+        ["Vendor C", "REGION 1", 900,980,720,2600],
+        ["Vendor C", "REGION 2", 300,320,230,850],
+        ["Vendor C", "REGION 3", 320,350,240,910],
+        ["Vendor C", "TOTAL", 1520,1650,1190,4360],
+    ]
+    df_merge_transpose = pd.DataFrame(data, columns=columns)
+    return df_merge, df_merge_transpose
+
+df_merge, df_merge_transpose = merge_demo()
 
-# DataFrame
-columns = ["VENDOR", "SCOPE TOTAL PRICE (IDR)", "REGION 1", "REGION 2", "REGION 3", "TOTAL"]
-data = [
-    ["Vendor A", "MBTS", 800, 250, 300, 1350],
-    ["Vendor A", "Reposition", 750, 250, 260, 1260],
-    ["Vendor A", "Reroute", 1140, 380, 390, 1910],
-    ["Vendor A", "TOTAL", 2690, 880, 950, 4520],
-
-    ["Vendor B", "MBTS", 1250, 400, 450, 2100],
-    ["Vendor B", "Reposition", 650, 200, 220, 1070],
-    ["Vendor B", "Reroute", 810, 270, 280, 1360],
-    ["Vendor B", "TOTAL", 2710, 870, 950, 4530],
-
-    ["Vendor C", "MBTS", 900, 300, 320, 1520],
-    ["Vendor C", "Reposition", 980, 320, 350, 1650],
-    ["Vendor C", "Reroute", 720, 230, 240, 1190],
-    ["Vendor C", "TOTAL", 2600, 850, 910, 4360],
-]
-df_merge = pd.DataFrame(data, columns=columns)
+@st.fragment
+def merge_data_section(df_merge, df_merge_transpose):
+    st.markdown("**:red-badge[1. MERGE DATA]**")
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; margin-top:-10px;">
+                The system will merge the tables from each sheet into a single table and add a 
+                <span style="background:#FFCB09; padding:2px 4px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">TOTAL ROW</span> 
+                for each vendor.
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-num_cols = ["REGION 1", "REGION 2", "TOTAL"]
-df_merge_styled = (
-    df_merge.style
-    .format({col: format_rupiah for col in num_cols})
-    .apply(highlight_total, axis=1)
-)
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
+                🛸 Original Data
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-st.dataframe(df_merge_styled, hide_index=True)
+    num_cols = ["REGION 1", "REGION 2", "TOTAL"]
+    show_table(
+        df_merge,
+        lambda df: (
+            df.style
+            .format({col: rupiah_formatter(df[col]) for col in num_cols})
+            .apply(style_total, axis=None)
+        ),
+        num_cols=num_cols,
+        cache_key="df_merge",
+    )
 
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
-            👽 Transpose Data
-        </div>
-    """,
-    unsafe_allow_html=True
-)
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
+                👽 Transpose Data
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-# DataFrame
-columns = ["VENDOR", "REGION", "MBTS", "Reposition", "Reroute", "TOTAL"]
-data = [
-    ["Vendor A", "REGION 1", 800,750,1140,2690],
-    ["Vendor A", "REGION 2", 250,250,380,880],
-    ["Vendor A", "REGION 3", 300,260,390,950],
-    ["Vendor A", "TOTAL", 1350,1260,1910,4520],
-
-    ["Vendor B", "REGION 1", 1250,650,810,2710],
-    ["Vendor B", "REGION 2", 400,200,270,870],
-    ["Vendor B", "REGION 3", 450,220,280,950],
-    ["Vendor B", "TOTAL", 2100,1070,1360,4530],
-
-    ["Vendor C", "REGION 1", 900,980,720,2600],
-    ["Vendor C", "REGION 2", 300,320,230,850],
-    ["Vendor C", "REGION 3", 320,350,240,910],
-    ["Vendor C", "TOTAL", 1520,1650,1190,4360],
-]
-df_merge_transpose = pd.DataFrame(data, columns=columns)
+    num_cols = ["MBTS", "Reposition", "Reroute", "TOTAL"]
+    show_table(
+        df_merge_transpose,
+        lambda df: (
+            df.style
+            .format({col: rupiah_formatter(df[col]) for col in num_cols})
+            .apply(style_total, axis=None)
+        ),
+        num_cols=num_cols,
+        cache_key="df_merge_transpose",
+    )
 
-num_cols = ["MBTS", "Reposition", "Reroute", "TOTAL"]
-df_merge_transpose_styled = (
-    df_merge_transpose.style
-    .format({col: format_rupiah for col in num_cols})
-    .apply(highlight_total, axis=1)
-)
+merge_data_section(df_merge, df_merge_transpose)
+
+@st.cache_resource(show_spinner=False)
+def tco_demo():
+    # Tabel contoh konstan, dibangun sekali per proses
+    # DataFrame
+    columns = ["SCOPE TOTAL PRICE (IDR)", "VENDOR A", "VENDOR B", "VENDOR C"]
+    data = [
+        ["MBTS", 1350, 2100, 1520],
+        ["Reposition", 1260, 1070, 1650],
+        ["Reroute", 1910, 1360, 1190],
+        ["TOTAL", 4520, 4530, 4360]
+    ]
+    df_tco_ori = pd.DataFrame(data, columns=columns)
+
+    # DataFrame
+    columns = ["REGION", "VENDOR A", "VENDOR B", "VENDOR C"]
+    data = [
+        ["REGION 1", 2690, 2710, 2600],
+        ["REGION 2", 880, 870, 850],
+        ["REGION 3", 950, 950, 910],
+        ["TOTAL", 4520, 4530, 4360]
+    ]
+    df_tco_transpose = pd.DataFrame(data, columns=columns)
+    return df_tco_ori, df_tco_transpose
+
+df_tco_ori, df_tco_transpose = tco_demo()
 
-st.dataframe(df_merge_transpose_styled, hide_index=True)
+@st.fragment
+def tco_summary_section(df_tco_ori, df_tco_transpose):
+    st.markdown("**:orange-badge[2. TCO SUMMARY]**")
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; margin-top:-10px;">
+                After merging the data, the system will automatically generate a TCO Summary that includes 
+                the TOTAL calculations.
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-st.write("")
-st.markdown("**:orange-badge[2. TCO SUMMARY]**")
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; margin-top:-10px;">
-            After merging the data, the system will automatically generate a TCO Summary that includes 
-            the TOTAL calculations.
-        </div>
-    """,
-    unsafe_allow_html=True
-)
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
+                🛸 Original Data
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
-            🛸 Original Data
+    st.markdown(
+        """
+        <div style="text-align:left; margin-bottom: 8px">
+            <span style="background:#C6EFCE; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">1st Lowest</span>
+            &nbsp;
+            <span style="background:#FFEB9C; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">2nd Lowest</span>
         </div>
-    """,
-    unsafe_allow_html=True
-)
+        """,
+        unsafe_allow_html=True
+    )
 
-st.markdown(
-    """
-    <div style="text-align:left; margin-bottom: 8px">
-        <span style="background:#C6EFCE; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">1st Lowest</span>
-        &nbsp;
-        <span style="background:#FFEB9C; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">2nd Lowest</span>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+    num_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
+    show_table(
+        df_tco_ori,
+        lambda df: (
+            df.style
+            .format({col: rupiah_formatter(df[col]) for col in num_cols})
+            .apply(style_total, css=BOLD_CSS, axis=None)
+            .apply(style_rank, num_cols=num_cols, axis=None)
+        ),
+        num_cols=num_cols,
+        rank_cols=num_cols,
+        cache_key="df_tco_ori",
+    )
 
-# DataFrame
-columns = ["SCOPE TOTAL PRICE (IDR)", "VENDOR A", "VENDOR B", "VENDOR C"]
-data = [
-    ["MBTS", 1350, 2100, 1520],
-    ["Reposition", 1260, 1070, 1650],
-    ["Reroute", 1910, 1360, 1190],
-    ["TOTAL", 4520, 4530, 4360]
-]
-df_tco_ori = pd.DataFrame(data, columns=columns)
-
-num_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
-df_tco_ori_styled = (
-    df_tco_ori.style
-    .format({col: format_rupiah for col in num_cols})
-    .apply(highlight_bold, axis=1)
-    .apply(lambda row: highlight_rank_summary(row, num_cols), axis=1)
-)
-st.dataframe(df_tco_ori_styled, hide_index=True)
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
+                👽 Transposed Data
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
-            👽 Transposed Data
+    st.markdown(
+        """
+        <div style="text-align:left; margin-bottom: 8px">
+            <span style="background:#C6EFCE; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">1st Lowest</span>
+            &nbsp;
+            <span style="background:#FFEB9C; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">2nd Lowest</span>
         </div>
-    """,
-    unsafe_allow_html=True
-)
-
-st.markdown(
-    """
-    <div style="text-align:left; margin-bottom: 8px">
-        <span style="background:#C6EFCE; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">1st Lowest</span>
-        &nbsp;
-        <span style="background:#FFEB9C; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">2nd Lowest</span>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+        """,
+        unsafe_allow_html=True
+    )
 
-# DataFrame
-columns = ["REGION", "VENDOR A", "VENDOR B", "VENDOR C"]
-data = [
-    ["REGION 1", 2690, 2710, 2600],
-    ["REGION 2", 880, 870, 850],
-    ["REGION 3", 950, 950, 910],
-    ["TOTAL", 4520, 4530, 4360]
-]
-df_tco_transpose = pd.DataFrame(data, columns=columns)
-
-num_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
-df_tco_transpose_styled = (
-    df_tco_transpose.style
-    .format({col: format_rupiah for col in num_cols})
-    .apply(highlight_bold, axis=1)
-    .apply(lambda row: highlight_rank_summary(row, num_cols), axis=1)
-)
-st.dataframe(df_tco_transpose_styled, hide_index=True)
+    num_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
+    show_table(
+        df_tco_transpose,
+        lambda df: (
+            df.style
+            .format({col: rupiah_formatter(df[col]) for col in num_cols})
+            .apply(style_total, css=BOLD_CSS, axis=None)
+            .apply(style_rank, num_cols=num_cols, axis=None)
+        ),
+        num_cols=num_cols,
+        rank_cols=num_cols,
+        cache_key="df_tco_transpose",
+    )
 
 st.write("")
-st.markdown("**:yellow-badge[3. BID & PRICE ANALYSIS]**")
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; margin-top:-10px;">
-            This menu also displays an analysis table that provides a comprehensive overview of the pricing structure 
-            submitted by each vendor.
-        </div>
-    """,
-    unsafe_allow_html=True
-)
+tco_summary_section(df_tco_ori, df_tco_transpose)
+
+@st.cache_resource(show_spinner=False)
+def analysis_demo():
+    # Tabel contoh konstan, dibangun sekali per proses
+    # DataFrame
+    columns = ["REGION", "SCOPE TOTAL PRICE (IDR)", "VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "1st Vendor", "2nd Lowest", "2nd Vendor", "Gap 1 to 2 (%)", "Median Price", "VENDOR A to Median (%)", "VENDOR B to Median (%)", "VENDOR C to Median (%)"]
+    data = [
+        ["REGION 1", "MBTS", 800, 1250, 900, 800, "VENDOR A", 900, "VENDOR C", 12.5, 900, -11.1, 38.9, 0],
+        ["REGION 1", "Reposition", 750, 650, 980, 650, "VENDOR B", 750, "VENDOR A", 15.4, 750, 0, -13.3, 30.7],
+        ["REGION 1", "Reroute", 1140, 810, 720, 720, "VENDOR C", 810, "VENDOR B", 12.5, 810, 40.7, 0, -11.1],
+
+        ["REGION 2", "MBTS", 250, 400, 300, 250, 'VENDOR A', 300, "VENDOR C", 20, 300, -16.7, 33.3, 0],
+        ["REGION 2", "Reposition", 250, 200, 320, 200, "VENDOR B", 250, "VENDOR A", 25, 250, 0, -20, 28],
+        ["REGION 2", "Reroute", 380, 270, 230, 230, "VENDOR C", 270, "VENDOR B", 17.4, 270, 40.7, 0, -14.8],
+
+        ["REGION 3", "MBTS", 300, 450, 320, 300, "VENDOR A", 320, "VENDOR C", 6.7, 320, -6.2, 40.6, 0],
+        ["REGION 3", "Reposition", 260, 220, 350, 220, "VENDOR B", 260, "VENDOR A", 18.2, 260, 0, -15.4, 34.6],
+        ["REGION 3", "Reroute", 390, 280, 240, 240, "VENDOR C", 280, "VENDOR B", 16.7, 280, 39.3, 0, -14.3],
+    ]
+    df_analysis = pd.DataFrame(data, columns=columns)
+
+    # DataFrame
+    columns = ["SCOPE", "REGION", "VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "1st Vendor", "2nd Lowest", "2nd Vendor", "Gap 1 to 2 (%)", "Median Price", "VENDOR A to Median (%)", "VENDOR B to Median (%)", "VENDOR C to Median (%)"]
+    data = [
+        ["MBTS","REGION 1", 800, 1250, 900, 800, "VENDOR A", 900, "VENDOR C", 12.5, 900, -11.1, 38.9, 0],
+        ["MBTS","REGION 2", 250, 400, 300, 250, "VENDOR A", 300, "VENDOR C", 20, 300, -16.7, 33.3, 0],
+        ["MBTS","REGION 3", 300, 450, 320, 300, "VENDOR A", 320, "VENDOR C", 6.7, 320, -6.2, 40.6, 0],
+
+        ["Reposition","REGION 1", 750, 650, 980, 650, 'VENDOR B', 750, "VENDOR A", 15.4, 750, 0, -13.3, 30.7],
+        ["Reposition","REGION 2", 250, 200, 320, 200, "VENDOR B", 250, "VENDOR A", 25, 250, 0, -20, 28],
+        ["Reposition","REGION 3", 260, 220, 350, 220, "VENDOR B", 260, "VENDOR A", 18.2, 260, 0, -15.4, 34.6],
+
+        ["Reroute","REGION 1", 1140, 810, 720, 720, "VENDOR C", 810, "VENDOR B", 12.5, 810, 40.7, 0, 11.1],
+        ["Reroute","REGION 2", 380, 270, 230, 230, "VENDOR C", 270, "VENDOR B", 17.4, 270, 40.7, 0, 14.8],
+        ["Reroute","REGION 3", 390, 280, 240, 240, "VENDOR C", 280, "VENDOR B", 16.7, 280, 39.3, 0, 14.3],
+    ]
+    df_analysis_transpose = pd.DataFrame(data, columns=columns)
+    return df_analysis, df_analysis_transpose
+
+df_analysis, df_analysis_transpose = analysis_demo()
 
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
-            🛸 Original Data
-        </div>
-    """,
-    unsafe_allow_html=True
-)
+@st.fragment
+def bid_price_section(df_analysis, df_analysis_transpose):
+    st.markdown("**:yellow-badge[3. BID & PRICE ANALYSIS]**")
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; margin-top:-10px;">
+                This menu also displays an analysis table that provides a comprehensive overview of the pricing structure 
+                submitted by each vendor.
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-st.markdown(
-    """
-    <div style="text-align:left; margin-bottom: 8px">
-        <span style="background:#C6EFCE; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">1st Lowest</span>
-        &nbsp;
-        <span style="background:#FFEB9C; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">2nd Lowest</span>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
+                🛸 Original Data
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-# DataFrame
-columns = ["REGION", "SCOPE TOTAL PRICE (IDR)", "VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "1st Vendor", "2nd Lowest", "2nd Vendor", "Gap 1 to 2 (%)", "Median Price", "VENDOR A to Median (%)", "VENDOR B to Median (%)", "VENDOR C to Median (%)"]
-data = [
-    ["REGION 1", "MBTS", 800, 1250, 900, 800, "VENDOR A", 900, "VENDOR C", 12.5, 900, -11.1, 38.9, 0],
-    ["REGION 1", "Reposition", 750, 650, 980, 650, "VENDOR B", 750, "VENDOR A", 15.4, 750, 0, -13.3, 30.7],
-    ["REGION 1", "Reroute", 1140, 810, 720, 720, "VENDOR C", 810, "VENDOR B", 12.5, 810, 40.7, 0, -11.1],
+    st.markdown(
+        """
+        <div style="text-align:left; margin-bottom: 8px">
+            <span style="background:#C6EFCE; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">1st Lowest</span>
+            &nbsp;
+            <span style="background:#FFEB9C; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">2nd Lowest</span>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-    ["REGION 2", "MBTS", 250, 400, 300, 250, 'VENDOR A', 300, "VENDOR C", 20, 300, -16.7, 33.3, 0],
-    ["REGION 2", "Reposition", 250, 200, 320, 200, "VENDOR B", 250, "VENDOR A", 25, 250, 0, -20, 28],
-    ["REGION 2", "Reroute", 380, 270, 230, 230, "VENDOR C", 270, "VENDOR B", 17.4, 270, 40.7, 0, -14.8],
+    num_cols = ["VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "2nd Lowest", "Median Price"]
+    pct_formats = {"Gap 1 to 2 (%)": "{:.1f}%"}
+
+    vendor_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
+    for v in vendor_cols:
+        pct_formats[f"{v} to Median (%)"] = "{:+.1f}%"
+
+    show_table(
+        df_analysis,
+        lambda df: (
+            df.style
+            .format({**{col: rupiah_formatter(df[col]) for col in num_cols}, **pct_formats})
+            .apply(style_vendor_rank, axis=None)
+        ),
+        num_cols=num_cols,
+        pct_formats=pct_formats,
+        total=False,
+        cache_key="df_analysis",
+    )
 
-    ["REGION 3", "MBTS", 300, 450, 320, 300, "VENDOR A", 320, "VENDOR C", 6.7, 320, -6.2, 40.6, 0],
-    ["REGION 3", "Reposition", 260, 220, 350, 220, "VENDOR B", 260, "VENDOR A", 18.2, 260, 0, -15.4, 34.6],
-    ["REGION 3", "Reroute", 390, 280, 240, 240, "VENDOR C", 280, "VENDOR B", 16.7, 280, 39.3, 0, -14.3],
-]
-df_analysis = pd.DataFrame(data, columns=columns)
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
+                👽 Transpose Data
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-num_cols = ["VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "2nd Lowest", "Median Price"]
-format_dic = {col: format_rupiah for col in num_cols}
-format_dic.update({"Gap 1 to 2 (%)": "{:.1f}%"})
+    st.markdown(
+        """
+        <div style="text-align:left; margin-bottom: 8px">
+            <span style="background:#C6EFCE; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">1st Lowest</span>
+            &nbsp;
+            <span style="background:#FFEB9C; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">2nd Lowest</span>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-vendor_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
-for v in vendor_cols:
-    format_dic[f"{v} to Median (%)"] = "{:+.1f}%"
+    num_cols = ["VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "2nd Lowest", "Median Price"]
+    pct_formats = {"Gap 1 to 2 (%)": "{:.1f}%"}
+
+    vendor_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
+    for v in vendor_cols:
+        pct_formats[f"{v} to Median (%)"] = "{:+.1f}%"
+
+    show_table(
+        df_analysis_transpose,
+        lambda df: (
+            df.style
+            .format({**{col: rupiah_formatter(df[col]) for col in num_cols}, **pct_formats})
+            .apply(style_vendor_rank, axis=None)
+        ),
+        num_cols=num_cols,
+        pct_formats=pct_formats,
+        total=False,
+        cache_key="df_analysis_transpose",
+    )
 
-df_analysis_styled = (
-    df_analysis.style
-    .format(format_dic)
-    .apply(lambda row: highlight_1st_2nd(row, df_analysis.columns), axis=1)
-)
+st.write("")
+bid_price_section(df_analysis, df_analysis_transpose)
 
-st.dataframe(df_analysis_styled, hide_index=True)
+@st.fragment
+def visualization_section(df_analysis):
+    st.markdown("**:green-badge[4. VISUALIZATION]**")
+    st.markdown(
+        """
+            <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; margin-top:-10px;">
+                This menu displays visualizations focusing on two key aspects: 
+                <span style="background: #FF5E5E; padding:1px 4px; border-radius:6px; font-weight:600; font-size: 13px; color: black">Win Rate Trend</span> and 
+                <span style="background: #FF00AA; padding:2px 4px; border-radius:6px; font-weight:600; font-size: 13px; color: black">Average Gap Trend</span>, 
+                each presented in its own tab.
+            </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; font-weight: bold">
-            👽 Transpose Data
-        </div>
-    """,
-    unsafe_allow_html=True
-)
+    # Hanya hasil agregasi per vendor yang dikirim ke browser
+    vendor_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
+    gaps, benchmark = average_gaps(df_analysis, vendor_cols)
 
-st.markdown(
-    """
-    <div style="text-align:left; margin-bottom: 8px">
-        <span style="background:#C6EFCE; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">1st Lowest</span>
-        &nbsp;
-        <span style="background:#FFEB9C; padding:2px 8px; border-radius:6px; font-weight:600; font-size: 0.75rem; color: black">2nd Lowest</span>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+    tab1, tab2 = st.tabs(["Win Rate Trend", "Average Gap Trend"])
 
-# DataFrame
-columns = ["SCOPE", "REGION", "VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "1st Vendor", "2nd Lowest", "2nd Vendor", "Gap 1 to 2 (%)", "Median Price", "VENDOR A to Median (%)", "VENDOR B to Median (%)", "VENDOR C to Median (%)"]
-data = [
-    ["MBTS","REGION 1", 800, 1250, 900, 800, "VENDOR A", 900, "VENDOR C", 12.5, 900, -11.1, 38.9, 0],
-    ["MBTS","REGION 2", 250, 400, 300, 250, "VENDOR A", 300, "VENDOR C", 20, 300, -16.7, 33.3, 0],
-    ["MBTS","REGION 3", 300, 450, 320, 300, "VENDOR A", 320, "VENDOR C", 6.7, 320, -6.2, 40.6, 0],
+    with tab1:
+        st.altair_chart(win_rate_chart(win_rates(df_analysis, vendor_cols)), width="stretch")
+        with st.expander("See explanation"):
+            st.caption('''
+                The visualization above compares the win rate of each vendor
+                based on how often they achieved 1st or 2nd place in all
+                tender evaluations.  
 
-    ["Reposition","REGION 1", 750, 650, 980, 650, 'VENDOR B', 750, "VENDOR A", 15.4, 750, 0, -13.3, 30.7],
-    ["Reposition","REGION 2", 250, 200, 320, 200, "VENDOR B", 250, "VENDOR A", 25, 250, 0, -20, 28],
-    ["Reposition","REGION 3", 260, 220, 350, 220, "VENDOR B", 260, "VENDOR A", 18.2, 260, 0, -15.4, 34.6],
+                **💡 How to interpret the chart**  
 
-    ["Reroute","REGION 1", 1140, 810, 720, 720, "VENDOR C", 810, "VENDOR B", 12.5, 810, 40.7, 0, 11.1],
-    ["Reroute","REGION 2", 380, 270, 230, 230, "VENDOR C", 270, "VENDOR B", 17.4, 270, 40.7, 0, 14.8],
-    ["Reroute","REGION 3", 390, 280, 240, 240, "VENDOR C", 280, "VENDOR B", 16.7, 280, 39.3, 0, 14.3],
-]
-df_analysis_transpose = pd.DataFrame(data, columns=columns)
+                - High 1st Win Rate (%)  
+                    Vendor is highly competitive and often offers the best commercial terms.  
+                - High 2nd Win Rate (%)  
+                    Vendor consistently performs well, often just slightly less competitive than the winner.  
+                - Large Gap Between 1st & 2nd Win Rate  
+                    Shows clear market dominance by certain vendors.
+            ''')
 
-num_cols = ["VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "2nd Lowest", "Median Price"]
-format_dic = {col: format_rupiah for col in num_cols}
-format_dic.update({"Gap 1 to 2 (%)": "{:.1f}%"})
+    with tab2:
+        st.altair_chart(average_gap_chart(gaps, benchmark), width="stretch")
+        with st.expander("See explanation"):
+            st.caption(f'''
+                The chart above shows the average price difference between 
+                the lowest and second-lowest bids for each vendor when they 
+                rank 1st, indicating their pricing dominance or competitiveness.
 
-vendor_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
-for v in vendor_cols:
-    format_dic[f"{v} to Median (%)"] = "{:+.1f}%"
+                **💡 How to interpret the chart**  
 
-df_analysis_transpose_styled = (
-    df_analysis_transpose.style
-    .format(format_dic)
-    .apply(lambda row: highlight_1st_2nd(row, df_analysis_transpose.columns), axis=1)
-)
+                - High Gap  
+                    High gap indicates strong vendor dominance (much lower prices).  
+                - Low Gap  
+                    Low gap indicates intense competition with similar pricing among vendors.  
 
-st.dataframe(df_analysis_transpose_styled, hide_index=True)
+                The dashed line represents the average gap across all vendors, serving as a benchmark ({benchmark:.1f}%).
+            ''')
 
 st.write("")
-st.markdown("**:green-badge[4. VISUALIZATION]**")
-st.markdown(
-    """
-        <div style="text-align: justify; font-size: 15px; margin-bottom: 10px; margin-top:-10px;">
-            This menu displays visualizations focusing on two key aspects: 
-            <span style="background: #FF5E5E; padding:1px 4px; border-radius:6px; font-weight:600; font-size: 13px; color: black">Win Rate Trend</span> and 
-            <span style="background: #FF00AA; padding:2px 4px; border-radius:6px; font-weight:600; font-size: 13px; color: black">Average Gap Trend</span>, 
-            each presented in its own tab.
-        </div>
-    """,
-    unsafe_allow_html=True
-)
-
-tab1, tab2 = st.tabs(["Win Rate Trend", "Average Gap Trend"])
+visualization_section(df_analysis)
 
-with tab1:
-    st.image("assets/1.png")
-    with st.expander("See explanation"):
-        st.caption('''
-            The visualization above compares the win rate of each vendor
-            based on how often they achieved 1st or 2nd place in all
-            tender evaluations.  
-                    
-            **💡 How to interpret the chart**  
-                    
-            - High 1st Win Rate (%)  
-                Vendor is highly competitive and often offers the best commercial terms.  
-            - High 2nd Win Rate (%)  
-                Vendor consistently performs well, often just slightly less competitive than the winner.  
-            - Large Gap Between 1st & 2nd Win Rate  
-                Shows clear market dominance by certain vendors.
-        ''')
-
-with tab2:
-    st.image("assets/2.png")
-    with st.expander("See explanation"):
-        st.caption('''
-            The chart above shows the average price difference between 
-            the lowest and second-lowest bids for each vendor when they 
-            rank 1st, indicating their pricing dominance or competitiveness.
-                    
-            **💡 How to interpret the chart**  
-                    
-            - High Gap  
-                High gap indicates strong vendor dominance (much lower prices).  
-            - Low Gap  
-                Low gap indicates intense competition with similar pricing among vendors.  
-            
-            The dashed line represents the average gap across all vendors, serving as a benchmark (16.0%).
-        ''')
-    
 st.write("")
 st.markdown("**:blue-badge[5. SUPER BUTTON]**")
 st.markdown(
@@ -780,294 +782,66 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-tab1, tab2 = st.tabs(["ORIGINAL DATA", "TRANSPOSE DATA"])
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_super_button(content_key, selected_sheets, _df_dict):
+    # content_key sudah mewakili isi dataframe, jadi _df_dict tidak perlu di-hash lagi
+    return generate_multi_sheet_excel(selected_sheets, _df_dict)
 
-with tab1:
-    dataframes = {
-        "Merge Data": df_merge,
-        "TCO Summary": df_tco_ori,
-        "Bid & Price Analysis": df_analysis,
-    }
+def super_button_data(selected_sheets, df_dict, debug=False):
+    # Dipanggil saat tombol Download diklik, bukan di setiap rerun.
+    # Streamlit menjalankannya di thread lain, jadi flag ?debug=1 sesi ini
+    # dibawa lewat argumen; tahap excel_export masuk ke log (bukan sidebar).
+    profiling.begin_run(debug)
+    selected_sheets = tuple(selected_sheets)
+    if export_cells(selected_sheets, df_dict) >= STREAM_MIN_CELLS:
+        # File besar: ditulis per baris ke file sementara dan tidak di-cache.
+        # download_button tetap menyimpan bytes-nya, jadi dibaca sekali di sini.
+        with stream_multi_sheet_excel(selected_sheets, df_dict) as output:
+            return output.read()
+    content_key = frames_fingerprint(selected_sheets, df_dict)
+    return build_super_button(content_key, selected_sheets, df_dict)
 
+@st.fragment
+def super_button(dataframes, file_name):
     # Tampilkan multiselect
-    selected_sheets = tab1.multiselect(
+    selected_sheets = st.multiselect(
         "Select sheets to download in a single Excel file:",
         options=list(dataframes.keys()),
         default=list(dataframes.keys())  # default semua dipilih
     )
 
-    # Fungsi "Super Button" & Formatting
-    def generate_multi_sheet_excel(selected_sheets, df_dict):
-        output = BytesIO()
-
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            for sheet in selected_sheets:
-                df = df_dict[sheet]
-                df.to_excel(writer, index=False, sheet_name=sheet)
-
-                workbook  = writer.book
-                worksheet = writer.sheets[sheet]
-
-                # ===== FORMAT =====
-                fmt_rp   = workbook.add_format({'num_format': '#,##0'})
-                fmt_pct  = workbook.add_format({'num_format': '#,##0.0"%"'})
-                fmt_bold = workbook.add_format({'bold': True, 'num_format': '#,##0'})
-
-                fmt_total = workbook.add_format({
-                    'bold': True,
-                    'bg_color': '#D9EAD3',
-                    'font_color': '#1A5E20',
-                    'num_format': '#,##0'
-                })
-
-                fmt_1 = workbook.add_format({
-                    'bg_color': '#C6EFCE',
-                    'num_format': '#,##0'
-                })
-
-                fmt_2 = workbook.add_format({
-                    'bg_color': '#FFEB9C',
-                    'num_format': '#,##0'
-                })
-
-                fmt_1b = workbook.add_format({
-                    'bg_color': '#C6EFCE',
-                    'bold': True,
-                    'num_format': '#,##0'
-                })
-
-                fmt_2b = workbook.add_format({
-                    'bg_color': '#FFEB9C',
-                    'bold': True,
-                    'num_format': '#,##0'
-                })
-
-                num_cols = df.select_dtypes(include=["number"]).columns.tolist()
-                pct_cols = [c for c in df.columns if "%" in c]
-
-                # ===== LOOP DATA =====
-                for r, (_, row) in enumerate(df.iterrows(), start=1):
-                    is_total = any(str(x).strip().upper() == "TOTAL" for x in row)
-
-                    first = second = None
-
-                    # ===== SUMMARY RANKING (EXCLUDE ZERO) =====
-                    if sheet == "TCO Summary":
-                        numeric_vals = row[num_cols]
-                        numeric_vals = numeric_vals[
-                            (numeric_vals.notna()) & (numeric_vals != 0)
-                        ]
-
-                        if not numeric_vals.empty:
-                            sorted_vals = numeric_vals.sort_values()
-                            first = sorted_vals.index[0]
-                            if len(sorted_vals) > 1:
-                                second = sorted_vals.index[1]
-
-                    # ===== BID & PRICE =====
-                    if sheet == "Bid & Price Analysis":
-                        first = row.get("1st Vendor")
-                        second = row.get("2nd Vendor")
-
-                    for c, col in enumerate(df.columns):
-                        val = row[col]
-
-                        # ===== SAFETY =====
-                        if pd.isna(val) or (isinstance(val, (int, float)) and np.isinf(val)):
-                            worksheet.write(r, c, "")
-                            continue
-
-                        fmt = None
-
-                        is_zero = isinstance(val, (int, float)) and val == 0
-                        # ===== NO HIGHLIGHT FOR ZERO (EXCEPT MERGE DATA) =====
-                        if is_zero and sheet != "Merge Data":
-                            fmt = None
-
-                        # ===== PICK FORMAT =====
-                        elif col == first:
-                            fmt = fmt_1b if is_total else fmt_1
-                        elif col == second:
-                            fmt = fmt_2b if is_total else fmt_2
-                        elif is_total and sheet == "Merge Data":
-                            fmt = fmt_total
-                        elif is_total:
-                            fmt = fmt_bold
-
-                        # ===== WRITE CELL =====
-                        if col in pct_cols:
-                            worksheet.write_number(r, c, val, fmt or fmt_pct)
-                        elif col in num_cols:
-                            worksheet.write_number(r, c, val, fmt or fmt_rp)
-                        else:
-                            worksheet.write(r, c, val, fmt)
-
-                    # ===== AUTOFIT =====
-                    for i, col in enumerate(df.columns):
-                        worksheet.set_column(
-                            i, i,
-                            max(len(str(col)), df[col].astype(str).map(len).max()) + 2
-                        )
-
-        output.seek(0)
-        return output.getvalue()
-
     # ---- DOWNLOAD BUTTON ----
     if selected_sheets:
-        excel_bytes = generate_multi_sheet_excel(selected_sheets, dataframes)
-
         st.download_button(
             label="Download",
-            data=excel_bytes,
-            file_name="Super Botton - Original Data - TCO Comparison by Region.xlsx",
+            data=partial(super_button_data, selected_sheets, dataframes, profiling.enabled()),
+            file_name=file_name,
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             type="primary",
-            use_container_width=True,
+            width="stretch",
         )
 
+tab1, tab2 = st.tabs(["ORIGINAL DATA", "TRANSPOSE DATA"])
 
-with tab2:
-    dataframes = {
-        "Merge Transposed": df_merge_transpose,
-        "TCO Summary Transposed": df_tco_transpose,
-        "Bid & Price Analysis Transposed": df_analysis_transpose,
-    }
-
-    # Tampilkan multiselect
-    selected_sheets = tab2.multiselect(
-        "Select sheets to download in a single Excel file:",
-        options=list(dataframes.keys()),
-        default=list(dataframes.keys())  # default semua dipilih
+with tab1:
+    super_button(
+        {
+            "Merge Data": df_merge,
+            "TCO Summary": df_tco_ori,
+            "Bid & Price Analysis": df_analysis,
+        },
+        "Super Botton - Original Data - TCO Comparison by Region.xlsx",
     )
 
-    # Fungsi "Super Button" & Formatting
-    def generate_multi_sheet_excel_transposed(selected_sheets, df_dict):
-        output = BytesIO()
-
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            for sheet in selected_sheets:
-                df = df_dict[sheet]
-                df.to_excel(writer, index=False, sheet_name=sheet)
-
-                workbook  = writer.book
-                worksheet = writer.sheets[sheet]
-
-                # ===== FORMAT =====
-                fmt_rp   = workbook.add_format({'num_format': '#,##0'})
-                fmt_pct  = workbook.add_format({'num_format': '#,##0.0"%"'})
-                fmt_bold = workbook.add_format({'bold': True, 'num_format': '#,##0'})
-
-                fmt_total = workbook.add_format({
-                    'bold': True,
-                    'bg_color': '#D9EAD3',
-                    'font_color': '#1A5E20',
-                    'num_format': '#,##0'
-                })
-
-                fmt_1 = workbook.add_format({
-                    'bg_color': '#C6EFCE',
-                    'num_format': '#,##0'
-                })
-
-                fmt_2 = workbook.add_format({
-                    'bg_color': '#FFEB9C',
-                    'num_format': '#,##0'
-                })
-
-                fmt_1b = workbook.add_format({
-                    'bg_color': '#C6EFCE',
-                    'bold': True,
-                    'num_format': '#,##0'
-                })
-
-                fmt_2b = workbook.add_format({
-                    'bg_color': '#FFEB9C',
-                    'bold': True,
-                    'num_format': '#,##0'
-                })
-
-                num_cols = df.select_dtypes(include=["number"]).columns.tolist()
-                pct_cols = [c for c in df.columns if "%" in c]
-
-                # ===== LOOP DATA =====
-                for r, (_, row) in enumerate(df.iterrows(), start=1):
-                    is_total = any(str(x).strip().upper() == "TOTAL" for x in row)
-
-                    first = second = None
-
-                    # ===== SUMMARY RANKING (EXCLUDE ZERO) =====
-                    if sheet == "TCO Summary Transposed":
-                        numeric_vals = row[num_cols]
-                        numeric_vals = numeric_vals[
-                            (numeric_vals.notna()) & (numeric_vals != 0)
-                        ]
-
-                        if not numeric_vals.empty:
-                            sorted_vals = numeric_vals.sort_values()
-                            first = sorted_vals.index[0]
-                            if len(sorted_vals) > 1:
-                                second = sorted_vals.index[1]
-
-                    # ===== BID & PRICE =====
-                    if sheet == "Bid & Price Analysis Transposed":
-                        first = row.get("1st Vendor")
-                        second = row.get("2nd Vendor")
-
-                    for c, col in enumerate(df.columns):
-                        val = row[col]
-
-                        # ===== SAFETY =====
-                        if pd.isna(val) or (isinstance(val, (int, float)) and np.isinf(val)):
-                            worksheet.write(r, c, "")
-                            continue
-
-                        fmt = None
-
-                        is_zero = isinstance(val, (int, float)) and val == 0
-                        # ===== NO HIGHLIGHT FOR ZERO (EXCEPT MERGE DATA) =====
-                        if is_zero and sheet != "Merge Transposed":
-                            fmt = None
-
-                        # ===== PICK FORMAT =====
-                        elif col == first:
-                            fmt = fmt_1b if is_total else fmt_1
-                        elif col == second:
-                            fmt = fmt_2b if is_total else fmt_2
-                        elif is_total and sheet == "Merge Transposed":
-                            fmt = fmt_total
-                        elif is_total:
-                            fmt = fmt_bold
-
-                        # ===== WRITE CELL =====
-                        if col in pct_cols:
-                            worksheet.write_number(r, c, val, fmt or fmt_pct)
-                        elif col in num_cols:
-                            worksheet.write_number(r, c, val, fmt or fmt_rp)
-                        else:
-                            worksheet.write(r, c, val, fmt)
-
-                    # ===== AUTOFIT =====
-                    for i, col in enumerate(df.columns):
-                        worksheet.set_column(
-                            i, i,
-                            max(len(str(col)), df[col].astype(str).map(len).max()) + 2
-                        )
-
-        output.seek(0)
-        return output.getvalue()
-
-    # ---- DOWNLOAD BUTTON ----
-    if selected_sheets:
-        excel_bytes = generate_multi_sheet_excel_transposed(selected_sheets, dataframes)
-
-        tab2.download_button(
-            label="Download",
-            data=excel_bytes,
-            file_name="Super Botton - Transpose Data - TCO Comparison by Region.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            type="primary",
-            use_container_width=True,
-        )
+with tab2:
+    super_button(
+        {
+            "Merge Transposed": df_merge_transpose,
+            "TCO Summary Transposed": df_tco_transpose,
+            "Bid & Price Analysis Transposed": df_analysis_transpose,
+        },
+        "Super Botton - Transpose Data - TCO Comparison by Region.xlsx",
+    )
 
 st.write("")
 st.divider()
@@ -1084,4 +858,6 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-st.video("https://youtu.be/2oo8SNo39A8?si=ioHAlGCnwq13Dj4V")
\ No newline at end of file
+st.video("https://youtu.be/2oo8SNo39A8?si=ioHAlGCnwq13Dj4V")
+
+debug_sidebar()
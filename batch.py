@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from engine import TenderViews
+from excel_export import EXPORT_HIGHLIGHT, HIGHLIGHT_CELLS, HIGHLIGHT_CONDITIONAL, stream_multi_sheet_excel
+from ingest import read_tender
+
+WORKBOOK_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+OUTPUT_SUFFIX = " - TCO Comparison by Region.xlsx"
+
+
+def output_path(source, out_dir):
+    return Path(out_dir) / f"{Path(source).stem}{OUTPUT_SUFFIX}"
+
+
+def up_to_date(source, output):
+    # output written after the workbook last changed
+    try:
+        return output.stat().st_mtime >= Path(source).stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def write_workbook(source, output, highlight=None):
+    # the app's pipeline for one tender -> Super Button workbook on disk.
+    # Ingest stays serial here, the batch is already spread over processes.
+    views = TenderViews(read_tender(str(source), workers=1))
+    sheets = views.sheets()
+    # written row by row and copied to disk, the workbook is never held as bytes
+    tmp = output.with_name(output.name + ".tmp")
+    try:
+        with stream_multi_sheet_excel(list(sheets), sheets, highlight=highlight) as data, open(tmp, "wb") as f:
+            shutil.copyfileobj(data, f)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    # write then rename, so an interrupted run never leaves an "up to date" half file
+    os.replace(tmp, output)
+    return {
+        "vendors": len(views.cube.vendors),
+        "scopes": len(views.cube.scopes),
+        "regions": len(views.cube.regions),
+        "bytes": output.stat().st_size,
+    }
+
+
+def process_workbook(source, output, highlight=None):
+    # Worker: (status, log fields). A failed tender is reported, not raised,
+    # so its record carries the time spent on it like a processed one.
+    start = time.perf_counter()
+    try:
+        status, fields = "ok", {"output": str(output), **write_workbook(source, output, highlight)}
+    except Exception as e:
+        status, fields = "error", {"error": f"{type(e).__name__}: {e}"}
+    fields["seconds"] = round(time.perf_counter() - start, 3)
+    return status, fields
+
+
+def run_batch(in_dir, out_dir, log_path, workers=None, force=False, highlight=None):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sources = sorted(
+        p for p in Path(in_dir).iterdir()
+        if p.suffix.lower() in WORKBOOK_SUFFIXES and not p.name.startswith("~$")
+    )
+
+    counts = {"ok": 0, "skipped": 0, "error": 0}
+    with open(log_path, "a", encoding="utf-8") as log:
+        def record(source, status, **fields):
+            counts[status] += 1
+            entry = {"file": str(source), "status": status, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), **fields}
+            log.write(json.dumps(entry) + "\n")
+            log.flush()
+
+        todo = []
+        for source in sources:
+            output = output_path(source, out_dir)
+            if not force and up_to_date(source, output):
+                record(source, "skipped", output=str(output))
+            else:
+                todo.append((source, output))
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_workbook, source, output, highlight): source for source, output in todo}
+            # results are logged as they finish, not in submission order
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    status, fields = future.result()
+                except Exception as e:
+                    # the worker itself died (e.g. BrokenProcessPool): no timing
+                    status, fields = "error", {"error": f"{type(e).__name__}: {e}", "seconds": None}
+                record(source, status, **fields)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run TCO Comparison by Region over a directory of tender workbooks")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--log", default=None, help="JSONL log file (default: <output_dir>/batch_log.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="rebuild outputs that are already up to date")
+    parser.add_argument("--highlight", choices=[HIGHLIGHT_CELLS, HIGHLIGHT_CONDITIONAL], default=EXPORT_HIGHLIGHT,
+                        help="per-cell formats or Excel conditional formatting rules")
+    args = parser.parse_args()
+
+    log_path = args.log or os.path.join(args.output_dir, "batch_log.jsonl")
+    counts = run_batch(args.input_dir, args.output_dir, log_path, args.workers, args.force, args.highlight)
+    print(f"{counts['ok']} processed, {counts['skipped']} up to date, {counts['error']} failed -> {log_path}")
@@ -0,0 +1,234 @@
+import argparse
+import json
+import platform
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import engine
+import ingest
+from disk_cache import DiskCache
+from display import STYLER_MAX_CELLS, rank_side_channel
+from excel_export import (HIGHLIGHT_CELLS, HIGHLIGHT_CONDITIONAL, SHEET_SPECS, classify_columns,
+                          generate_multi_sheet_excel, stream_multi_sheet_excel)
+from formatting import (BOLD_CSS, format_rupiah, format_rupiah_series, rupiah_formatter, style_rank,
+                        style_total, style_vendor_rank)
+from synthetic import make_tender, make_workbook
+
+DEFAULT_GRID = "3x3x3,10x500x5,20x2000x10"
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def parse_grid(grid):
+    # "10x500x5,20x2000x10" -> [(vendors, scopes, regions), ...]
+    return [tuple(int(n) for n in size.split("x")) for size in grid.split(",") if size]
+
+
+def style_sheet(df, spec):
+    # What show_table does for one sheet: the Styler for small tables (rendered
+    # with to_html, close to what Streamlit computes), the rank side channel
+    # above STYLER_MAX_CELLS
+    kinds = dict(zip(df.columns, classify_columns(df)))
+    num_cols = [col for col, kind in kinds.items() if kind == "num"]
+    if df.size > STYLER_MAX_CELLS:
+        rank_cols = num_cols if spec.kind == "summary" else None
+        return rank_side_channel(df, total=spec.kind != "analysis", rank_cols=rank_cols)
+
+    formats = {col: rupiah_formatter(df[col]) for col in num_cols}
+    if spec.kind == "merge":
+        styler = df.style.format(formats).apply(style_total, axis=None)
+    elif spec.kind == "summary":
+        styler = (
+            df.style.format(formats)
+            .apply(style_total, css=BOLD_CSS, axis=None)
+            .apply(style_rank, num_cols=num_cols, axis=None)
+        )
+    else:
+        pct_formats = {
+            col: "{:.1f}%" if col == "Gap 1 to 2 (%)" else "{:+.1f}%"
+            for col, kind in kinds.items() if kind == "pct"
+        }
+        styler = df.style.format({**formats, **pct_formats}).apply(style_vendor_rank, axis=None)
+    return styler.to_html()
+
+
+def bench_stages(size, repeat=3):
+    # Every pipeline stage for one synthetic workbook size
+    n_vendors, n_scopes, n_regions = size
+    data = make_workbook(n_vendors, n_scopes, n_regions)
+    tender = ingest.read_tender(data, workers=1)
+    views = engine.TenderViews(tender)
+    sheets = views.sheets()
+
+    stages = {
+        "ingest": lambda: ingest.read_tender(data, workers=1),
+        "merge": lambda: engine.merge_data(tender),
+        "cube": lambda: engine.price_cube(engine.long_table(tender)),
+        "summary": lambda: [engine.tco_summary(views.cube, o) for o in (engine.ORIGINAL, engine.TRANSPOSED)],
+        "analysis": lambda: engine.bid_price_analysis(views.cube),
+        "transpose": lambda: (
+            engine.merge_transposed(views.cube),
+            engine.analysis_transposed(views.analysis, views.cube.scope_col),
+        ),
+        "styling": lambda: [style_sheet(df, SHEET_SPECS[name]) for name, df in sheets.items()],
+        "export": lambda: generate_multi_sheet_excel(list(sheets), sheets, highlight=HIGHLIGHT_CELLS),
+        "export_conditional": lambda: generate_multi_sheet_excel(list(sheets), sheets, highlight=HIGHLIGHT_CONDITIONAL),
+        "export_stream": lambda: stream_multi_sheet_excel(list(sheets), sheets, highlight=HIGHLIGHT_CELLS).close(),
+    }
+    return {
+        "vendors": n_vendors,
+        "scopes": n_scopes,
+        "regions": n_regions,
+        "workbook_bytes": len(data),
+        "cells": int(sum(df.size for df in sheets.values())),
+        "seconds": {name: round(best_of(fn, repeat), 4) for name, fn in stages.items()},
+    }
+
+
+def check_compact(size, seed=0):
+    # TenderViews keeps compact (float32 / categorical) frames; every view must
+    # hold the same values as the engine run on the full-precision tender.
+    # Prices get a fractional part so they downcast to float32, not int32.
+    tender = make_tender(*size, seed=seed)
+    num_cols = tender.select_dtypes(include=["number"]).columns
+    tender[num_cols] = tender[num_cols] + 0.5
+
+    long = engine.long_table(tender)
+    cube = engine.price_cube(long)
+    analysis = engine.bid_price_analysis(cube)
+    expected = {
+        "Merge Data": engine.merge_data(tender),
+        "TCO Summary": engine.tco_summary(cube, engine.ORIGINAL),
+        "Bid & Price Analysis": analysis,
+        "Merge Transposed": engine.merge_transposed(cube),
+        "TCO Summary Transposed": engine.tco_summary(cube, engine.TRANSPOSED),
+        "Bid & Price Analysis Transposed": engine.analysis_transposed(analysis, cube.scope_col),
+    }
+    mismatched = []
+    for name, df in engine.TenderViews(tender).sheets().items():
+        try:
+            pd.testing.assert_frame_equal(
+                df.astype(object), expected[name].astype(object), check_dtype=False, check_exact=True
+            )
+        except AssertionError:
+            mismatched.append(name)
+    return mismatched
+
+
+def check_disk_cache(size, seed=0):
+    # A disk-cache hit must give the same six views as a fresh parse, with a
+    # Desc label column next to the scope as in the guide's input layout
+    tender = make_tender(*size, seed=seed)
+    tender.insert(2, "Desc", [f"Item {i % 7}" for i in range(len(tender))])
+    fresh = engine.TenderViews(tender)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DiskCache(directory)
+        cache.store("check", fresh.tender)
+        cached = engine.TenderViews(cache.load("check"))
+
+    mismatched = []
+    for name, df in cached.sheets().items():
+        try:
+            pd.testing.assert_frame_equal(df, fresh.sheets()[name], check_exact=True)
+        except AssertionError:
+            mismatched.append(name)
+    return mismatched
+
+
+def bench_rupiah(frames, repeat=3):
+    # per-cell format_rupiah vs format_rupiah_series over every number in the merge sheet
+    df = frames["Merge Data"]
+    values = pd.concat([df[col] for col in df.select_dtypes(include=["number"]).columns], ignore_index=True)
+    scalar = best_of(lambda: values.map(format_rupiah), repeat)
+    vector = best_of(lambda: format_rupiah_series(values), repeat)
+    return len(values), scalar, vector
+
+
+def bench_analysis(n_rows=1_000_000, n_vendors=20, repeat=3, seed=0):
+    # price_ranking on a (region x scope) x vendor matrix, ~5% zero bids
+    rng = np.random.default_rng(seed)
+    prices = rng.integers(100, 5000, size=(n_rows, n_vendors)) * 1000.0
+    prices[rng.random(prices.shape) < 0.05] = 0
+    vendors = [f"VENDOR {i + 1}" for i in range(n_vendors)]
+    return best_of(lambda: engine.price_ranking(prices, vendors), repeat)
+
+
+def bench_ingest(data, max_workers, repeat=3):
+    # read_tender with 1..max_workers processes; the pool is warmed up first
+    # so process start-up is not counted
+    timings = {}
+    for workers in range(1, max_workers + 1):
+        ingest.read_tender(data, workers)
+        timings[workers] = best_of(lambda: ingest.read_tender(data, workers), repeat)
+    return timings
+
+
+def environment():
+    # stored with the results, so runs from different versions can be compared
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "parser_version": ingest.PARSER_VERSION,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the TCO Comparison by Region pipeline")
+    parser.add_argument("--grid", default=DEFAULT_GRID, help="sizes as VENDORSxSCOPESxREGIONS, comma separated")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", default="bench_results.json", help="where to save the results")
+    parser.add_argument("--micro", action="store_true",
+                        help="also run the rupiah, price_ranking and ingest scaling benchmarks")
+    parser.add_argument("--analysis-rows", type=int, default=1_000_000)
+    parser.add_argument("--analysis-vendors", type=int, default=20)
+    parser.add_argument("--sheets", type=int, default=40, help="vendor sheets in the ingest scaling workbook")
+    parser.add_argument("--workers", type=int, default=ingest.INGEST_WORKERS, help="max ingest workers")
+    args = parser.parse_args()
+
+    results = {"environment": environment(), "sizes": []}
+    for size in parse_grid(args.grid):
+        mismatched = check_compact(size)
+        if mismatched:
+            raise SystemExit(f"{'x'.join(map(str, size))}: compact views differ from the engine in {mismatched}")
+        mismatched = check_disk_cache(size)
+        if mismatched:
+            raise SystemExit(f"{'x'.join(map(str, size))}: disk-cached views differ from a fresh parse in {mismatched}")
+        result = bench_stages(size, args.repeat)
+        results["sizes"].append(result)
+        stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result["seconds"].items())
+        print(f"{'x'.join(map(str, size))} ({result['cells']:,} cells): {stages}")
+
+    if args.micro:
+        frames = engine.TenderViews(make_tender(15, 2000, 10)).sheets()
+        n, scalar, vector = bench_rupiah(frames, args.repeat)
+        results["rupiah"] = {"values": n, "format_rupiah": scalar, "format_rupiah_series": vector}
+        print(f"{n:,} values -> format_rupiah {scalar:.2f}s, format_rupiah_series {vector:.2f}s")
+
+        seconds = bench_analysis(args.analysis_rows, args.analysis_vendors, args.repeat)
+        results["price_ranking"] = {"rows": args.analysis_rows, "vendors": args.analysis_vendors, "seconds": seconds}
+        print(f"{args.analysis_rows:,} rows x {args.analysis_vendors} vendors -> price_ranking {seconds:.2f}s")
+
+        data = make_workbook(args.sheets, 2000, 10)
+        timings = bench_ingest(data, args.workers, args.repeat)
+        results["ingest_workers"] = timings
+        for workers, seconds in timings.items():
+            print(f"{args.sheets} sheets, {len(data) / 1e6:.1f} MB -> read_tender workers={workers} "
+                  f"{seconds:.2f}s ({timings[1] / seconds:.1f}x)")
+
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"saved {args.json}")
@@ -0,0 +1,46 @@
+import altair as alt
+import pandas as pd
+
+from ingest import VENDOR_COL
+
+RANK_COLORS = ["#1F4BFF", "#FFA51F"]
+GAP_COLORS = ["#FFA51F", "#FF3333", "#F0762B"]
+
+
+def _vendor_axis(vendors):
+    return alt.X(f"{VENDOR_COL}:N", sort=list(vendors), title=None, axis=alt.Axis(labelAngle=-90))
+
+
+def win_rate_chart(rates):
+    # rates: engine.win_rates -> 1st / 2nd place lines per vendor
+    vendors = pd.unique(rates[VENDOR_COL])
+    base = alt.Chart(rates).encode(
+        x=_vendor_axis(vendors),
+        y=alt.Y("Win Rate (%):Q"),
+        color=alt.Color("Rank:N", scale=alt.Scale(range=RANK_COLORS), legend=alt.Legend(orient="bottom")),
+        tooltip=[VENDOR_COL, "Rank", alt.Tooltip("Win Rate (%):Q", format=".1f")],
+    )
+    lines = base.mark_line(point=alt.OverlayMarkDef(size=120))
+    labels = base.mark_text(dy=-12, fontWeight="bold").encode(
+        text=alt.Text("Win Rate (%):Q", format=".1f")
+    )
+    return (lines + labels).properties(title="Vendor Win Rate Comparison (1st vs 2nd Place)")
+
+
+def average_gap_chart(gaps, benchmark):
+    # gaps, benchmark: engine.average_gaps -> one bar per winning vendor + dashed benchmark
+    bars = alt.Chart(gaps).encode(
+        x=_vendor_axis(gaps[VENDOR_COL]),
+        y=alt.Y("Average Gap (%):Q"),
+        tooltip=[VENDOR_COL, alt.Tooltip("Average Gap (%):Q", format=".1f")],
+    )
+    columns = bars.mark_bar().encode(
+        color=alt.Color(f"{VENDOR_COL}:N", scale=alt.Scale(range=GAP_COLORS), legend=None)
+    )
+    labels = bars.mark_text(dy=-8, fontWeight="bold").encode(
+        text=alt.Text("Average Gap (%):Q", format=".1f")
+    )
+    rule = alt.Chart(pd.DataFrame({"Benchmark (%)": [benchmark]})).mark_rule(
+        strokeDash=[6, 4], color="gray", size=2
+    ).encode(y="Benchmark (%):Q", tooltip=[alt.Tooltip("Benchmark (%):Q", format=".1f")])
+    return (columns + labels + rule).properties(title="Average Gap (%) per 1st Vendor")
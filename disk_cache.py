@@ -0,0 +1,86 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow as pa
+
+from ingest import PARSER_VERSION
+
+# Parsed workbooks (the stacked tender, every label column included) as Arrow
+# IPC files, so a restart does not pay the Excel parse again. Frames are stored
+# compact (categorical labels, int32 / float32 prices), so a load is one copy
+# of an already small table into pandas.
+CACHE_DIR = Path(os.environ.get("TCO_DISK_CACHE_DIR", Path.home() / ".cache" / "tco-by-region"))
+CACHE_MAX_BYTES = int(os.environ.get("TCO_DISK_CACHE_MB", 2048)) * 1024 * 1024
+# temp files older than this are left over from a killed write
+STALE_TMP_SECONDS = 3600
+
+
+class DiskCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, version=PARSER_VERSION):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.version = version
+
+    def path(self, key):
+        # a parser change gives new file names, old entries just age out
+        # ("tender": entries of the stacked sheets, not the older long tables)
+        return self.directory / f"{key}-v{self.version}-tender.arrow"
+
+    def load(self, key):
+        # stacked tender or None; a missing, unreadable or broken entry is a miss
+        path = self.path(key)
+        try:
+            with pa.memory_map(str(path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+            # mtime is the LRU clock
+            os.utime(path)
+        except (OSError, pa.ArrowInvalid):
+            return None
+        return table.to_pandas()
+
+    def store(self, key, tender):
+        try:
+            table = pa.Table.from_pandas(tender, preserve_index=False)
+        except pa.ArrowException:
+            return   # e.g. numbers and text mixed in one label column: not cached
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # write to a temp file and rename, so readers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        # drop temp files of killed writes, then least recently used files
+        # until the cache fits max_bytes
+        now = time.time()
+        for path in self.directory.glob("*.tmp"):
+            try:
+                if now - path.stat().st_mtime > STALE_TMP_SECONDS:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+
+        entries = []
+        for path in self.directory.glob("*.arrow"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def size(self):
+        return sum(path.stat().st_size for pattern in ("*.arrow", "*.tmp") for path in self.directory.glob(pattern))
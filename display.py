@@ -0,0 +1,96 @@
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import profiling
+from formatting import lowest_two, total_row_mask
+
+# Tables with more cells than this skip pandas Styler: the raw frame goes to
+# the browser as Arrow and Streamlit formats the numbers client-side.
+STYLER_MAX_CELLS = int(os.environ.get("TCO_STYLER_MAX_CELLS", 200_000))
+
+# "localized" follows the browser locale, so id-ID users get 1.234.567
+RUPIAH_FORMAT = "localized"
+TOTAL_MARK = "Σ"
+
+
+def _printf(fmt):
+    # "{:+.1f}%" (Styler) -> "%+.1f%%" (st.column_config / sprintf-js)
+    return fmt.replace("%", "%%").replace("{:", "%").replace("}", "")
+
+
+def number_column_config(num_cols, pct_formats=None):
+    config = {col: st.column_config.NumberColumn(format=RUPIAH_FORMAT) for col in num_cols}
+    for col, fmt in (pct_formats or {}).items():
+        config[col] = st.column_config.NumberColumn(format=_printf(fmt))
+    return config
+
+
+def rank_side_channel(df, total=True, rank_cols=None):
+    # The highlighting as a couple of small columns instead of a CSS string per
+    # cell: a marker on TOTAL rows and the 1st / 2nd lowest vendor per row.
+    marks = {}
+    if total:
+        marks[" "] = np.where(total_row_mask(df), TOTAL_MARK, "")
+    if rank_cols:
+        first, second = lowest_two(df[rank_cols].to_numpy(dtype=float))
+        names = np.append(np.array(rank_cols, dtype=object), None)
+        marks["1st"] = names[first]   # -1 picks the trailing None
+        marks["2nd"] = names[second]
+    return pd.DataFrame(marks, index=df.index)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _styler_template(cache_key, _df, _styler):
+    return _styler(_df)
+
+
+def show_table(df, styler, num_cols=(), pct_formats=None, total=True, rank_cols=None,
+               max_cells=None, cache_key=None):
+    # styler(df) builds the pandas Styler and is only called for small tables.
+    # cache_key: only for frames that never change (the guide's demo tables);
+    # the Styler, with its rupiah lookup tables, is then built once per process.
+    if max_cells is None:
+        max_cells = STYLER_MAX_CELLS
+
+    if df.size <= max_cells:
+        with profiling.stage("styler", df):
+            if cache_key is None:
+                styled = styler(df)
+            else:
+                # Streamlit computes the styles into the Styler it renders, so every
+                # rerun gets its own cheap copy (same data and formatters, fresh ctx)
+                styled = copy.deepcopy(_styler_template(cache_key, df, styler))
+            st.dataframe(styled, hide_index=True)
+        return
+
+    with profiling.stage("arrow_table", df):
+        marks = rank_side_channel(df, total, rank_cols)
+        st.dataframe(
+            pd.concat([marks, df], axis=1),
+            hide_index=True,
+            column_config=number_column_config(num_cols, pct_formats),
+        )
+
+
+def debug_sidebar():
+    # Stage timings of this run, for ?debug=1 sessions (or TCO_PROFILE=1)
+    if not profiling.enabled():
+        return
+    records = profiling.records()
+    with st.sidebar:
+        st.markdown("#### 🐞 Stage timings")
+        if not records:
+            st.caption("No stage ran in this rerun.")
+            return
+        table = pd.DataFrame(records)
+        table["stage"] = ["· " * d + s for d, s in zip(table["depth"], table["stage"])]
+        st.dataframe(
+            table[["stage", "seconds", "peak_mb", "input", "output"] if "output" in table else
+                  ["stage", "seconds", "peak_mb", "input"]],
+            hide_index=True,
+        )
+        st.caption(f"Also written to `{profiling.STAGE_LOG}`.")
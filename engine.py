@@ -0,0 +1,397 @@
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from ingest import VENDOR_COL
+from profiling import profiled
+
+TOTAL_LABEL = "TOTAL"
+
+
+def split_labels(tender):
+    # (label columns, numeric columns) of a read_tender frame, VENDOR excluded
+    numeric = tender.dtypes.map(pd.api.types.is_numeric_dtype)
+    labels = [c for c in tender.columns[~numeric.to_numpy(dtype=bool)] if c != VENDOR_COL]
+    return labels, list(tender.columns[numeric.to_numpy(dtype=bool)])
+
+
+# ===== MERGE DATA =====
+@profiled("merge")
+def merge_data(tender):
+    # Stacked vendor sheets (read_tender) -> every vendor's rows followed by its
+    # TOTAL row, plus a TOTAL column across the regions.
+    labels, num_cols = split_labels(tender)
+    codes, vendors = pd.factorize(tender[VENDOR_COL], sort=False)
+
+    # vendors in order of first appearance, each vendor's rows kept together
+    order = np.argsort(codes, kind="stable")
+    frame = tender.take(order)
+    codes = codes[order]
+
+    # one groupby for all TOTAL rows, summed in float64: compact frames hold
+    # float32 prices and a float32 running sum drops the small digits
+    totals = frame[num_cols].astype(float).groupby(codes, sort=False).sum()
+    totals.insert(0, VENDOR_COL, vendors.to_numpy(dtype=object)[totals.index])
+    for c, col in enumerate(labels):
+        totals.insert(1 + c, col, TOTAL_LABEL if c == 0 else "")
+
+    # interleave by index: vendor g's rows shift down by g, its TOTAL row takes
+    # the slot right after its last row
+    counts = np.bincount(codes, minlength=len(vendors))
+    ends = np.cumsum(counts)
+    frame.index = np.arange(len(frame)) + codes
+    totals.index = ends[totals.index] + totals.index
+
+    merged = pd.concat([frame, totals]).sort_index(kind="stable")
+    merged.index = pd.RangeIndex(len(merged))
+    merged[TOTAL_LABEL] = np.nansum(merged[num_cols].to_numpy(dtype=float), axis=1)
+    return merged
+
+
+# ===== LONG TABLE =====
+# One row per (vendor, scope, region) price. Both orientations come from
+# this table, so it is built once and shared by the two tabs.
+REGION_COL = "REGION"
+PRICE_COL = "PRICE"
+
+
+def _in_order(values):
+    # categorical whose categories keep the order of first appearance, so
+    # the cube axes stay in sheet order instead of sorted
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = pd.Categorical(values)
+        return values.set_categories(values.categories[pd.unique(values.codes[values.codes >= 0])])
+    categories = pd.unique(values)
+    return pd.Categorical(values, categories=categories[~pd.isna(categories)])
+
+
+@profiled("long_table")
+def long_table(tender):
+    # The scope is the first non-numeric column, every numeric column is a region
+    labels, num_cols = split_labels(tender)
+    scope = labels[0]
+    # labels become categoricals before the melt repeats them once per region
+    # (on the tender's own index, which need not be 0..n-1 for a filtered frame)
+    ids = pd.DataFrame({col: _in_order(tender[col]) for col in (VENDOR_COL, scope)}, index=tender.index)
+    long = pd.concat([ids, tender[num_cols]], axis=1).melt(
+        id_vars=[VENDOR_COL, scope], value_vars=num_cols,
+        var_name=REGION_COL, value_name=PRICE_COL,
+    )
+    long[REGION_COL] = pd.Categorical.from_codes(
+        np.repeat(np.arange(len(num_cols)), len(tender)), categories=num_cols
+    )
+    return long
+
+
+def wide_table(long):
+    # The stacked sheets back from a long table, rows in upload order. Only
+    # VENDOR and the scope column survive long_table, other label columns
+    # (Desc, ...) are gone: keep the tender itself where those matter.
+    scope = _scope_col(long)
+    regions = long[REGION_COL].cat.categories
+    n_rows = len(long) // max(len(regions), 1)
+    tender = long.iloc[:n_rows][[VENDOR_COL, scope]].astype(object)
+    prices = long[PRICE_COL].to_numpy(dtype=float).reshape(len(regions), n_rows).T
+    tender = pd.concat([tender, pd.DataFrame(prices, columns=regions.astype(object))], axis=1)
+    tender.index = pd.RangeIndex(n_rows)
+    return tender
+
+
+def _scope_col(long):
+    return long.columns[1]
+
+
+@profiled("transpose")
+def analysis_transposed(analysis, scope):
+    # Bid & Price Analysis rows are per (region, scope) in both tabs, the
+    # transposed one is just scope-major: reorder the rows, nothing is recomputed
+    codes = _in_order(analysis[scope]).codes
+    frame = analysis.take(np.argsort(codes, kind="stable"))
+    frame = frame[[scope, REGION_COL] + [c for c in frame.columns if c not in (scope, REGION_COL)]]
+    frame.index = pd.RangeIndex(len(frame))
+    return frame.rename(columns={scope: "SCOPE"})
+
+
+# ===== PRICE CUBE =====
+# Every view below is a slice or an axis sum of one dense
+# vendor x scope x region array, built once from the long table.
+ORIGINAL, TRANSPOSED = "original", "transposed"
+
+
+@dataclass(frozen=True)
+class PriceCube:
+    values: np.ndarray   # (vendor, scope, region), empty cells summed as 0
+    vendors: pd.Index
+    scopes: pd.Index
+    regions: pd.Index
+    scope_col: str
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+
+@profiled("cube")
+def price_cube(long):
+    scope = _scope_col(long)
+    axes = [long[col].cat for col in (VENDOR_COL, scope, REGION_COL)]
+    shape = tuple(len(ax.categories) for ax in axes)
+    # flat cell number per long row; bincount sums repeated (vendor, scope, region).
+    # A blank label has code -1 (_in_order leaves NaN out): that row has no
+    # cell in the cube and is dropped.
+    codes = tuple(ax.codes.to_numpy(dtype=np.intp) for ax in axes)
+    ok = np.logical_and.reduce([c >= 0 for c in codes])
+    flat = np.ravel_multi_index(tuple(c[ok] for c in codes), shape)
+    weights = np.nan_to_num(long[PRICE_COL].to_numpy(dtype=float)[ok], nan=0.0)
+    values = np.bincount(flat, weights=weights, minlength=int(np.prod(shape))).reshape(shape)
+    vendors, scopes, regions = (pd.Index(ax.categories, dtype=object) for ax in axes)
+    return PriceCube(values, vendors, scopes, regions, scope)
+
+
+@profiled("transpose")
+def merge_transposed(cube):
+    # Per vendor: regions as rows, scopes as columns; then the same TOTAL
+    # row / column as the original orientation
+    n_vendors, n_scopes, n_regions = cube.values.shape
+    wide = pd.DataFrame(
+        cube.values.transpose(0, 2, 1).reshape(n_vendors * n_regions, n_scopes),
+        columns=cube.scopes,
+    )
+    wide.insert(0, REGION_COL, np.tile(cube.regions.to_numpy(), n_vendors))
+    wide.insert(0, VENDOR_COL, np.repeat(cube.vendors.to_numpy(), n_regions))
+    return merge_data(wide)
+
+
+# ===== TCO SUMMARY =====
+@profiled("tco_summary")
+def tco_summary(cube, orientation=ORIGINAL):
+    # scope x vendor (original) or region x vendor (transposed), TOTAL row last
+    if orientation == ORIGINAL:
+        label, index, values = cube.scope_col, cube.scopes, cube.values.sum(axis=2)
+    else:
+        label, index, values = REGION_COL, cube.regions, cube.values.sum(axis=1)
+    return summary_frame(label, index, values, cube.values.sum(axis=(1, 2)), cube.vendors)
+
+
+def summary_frame(label, index, values, totals, vendors):
+    # values: (vendor, index) sums, totals: per vendor grand total
+    summary = pd.DataFrame(np.vstack([values.T, totals]), columns=vendors)
+    summary.insert(0, label, np.append(index.to_numpy(), TOTAL_LABEL))
+    return summary
+
+
+# ===== BID & PRICE ANALYSIS =====
+def price_ranking(prices, vendors):
+    # prices: (rows, vendors) matrix -> the analysis columns for every row at once.
+    # 0 (vendor tidak ikut tender) and NaN are not bids: they are skipped for the
+    # lowest two and the median, and get no "to Median (%)".
+    prices = np.asarray(prices, dtype=float)
+    n_rows = len(prices)
+    rows = np.arange(n_rows)
+
+    bid = np.isfinite(prices) & (prices != 0)
+    n_bids = bid.sum(axis=1)
+
+    # one stable sort per row gives the lowest two (ties to the left-most
+    # vendor, like lowest_two) and the median of the real bids. Two padding
+    # columns keep [:, 0] / [:, 1] valid however few vendors there are.
+    padded = np.hstack([np.where(bid, prices, np.inf), np.full((n_rows, 2), np.inf)])
+    order = np.argsort(padded, axis=1, kind="stable")
+    ranked = np.take_along_axis(padded, order, axis=1)
+
+    def nth(k):
+        ok = n_bids > k
+        return np.where(ok, ranked[:, k], np.nan), np.where(ok, order[:, k], -1)
+
+    first, first_pos = nth(0)
+    second, second_pos = nth(1)
+    names = np.append(np.array(vendors, dtype=object), None)   # -1 picks None
+
+    lo, hi = np.maximum((n_bids - 1) // 2, 0), n_bids // 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        median = np.where(n_bids > 0, (ranked[rows, lo] + ranked[rows, hi]) / 2, np.nan)
+        gap = (second - first) / first * 100
+        to_median = np.where(bid, (prices - median[:, None]) / median[:, None] * 100, np.nan)
+
+    columns = {
+        "1st Lowest": first,
+        "1st Vendor": names[first_pos],
+        "2nd Lowest": second,
+        "2nd Vendor": names[second_pos],
+        "Gap 1 to 2 (%)": gap,
+        "Median Price": median,
+    }
+    for v, vendor in enumerate(vendors):
+        columns[f"{vendor} to Median (%)"] = to_median[:, v]
+    return columns
+
+
+@profiled("analysis")
+def bid_price_analysis(cube):
+    # One row per (region, scope), region-major like the original tab
+    n_vendors, n_scopes, n_regions = cube.values.shape
+    prices = cube.values.transpose(2, 1, 0).reshape(n_regions * n_scopes, n_vendors)
+    return analysis_frame(
+        np.repeat(cube.regions.to_numpy(), n_scopes), np.tile(cube.scopes.to_numpy(), n_regions),
+        prices, cube.vendors.tolist(), cube.scope_col,
+    )
+
+
+def analysis_frame(regions, scopes, prices, vendors, scope_col):
+    # regions, scopes: label of each row; prices: (rows, vendors)
+    analysis = pd.DataFrame({REGION_COL: regions, scope_col: scopes})
+    for v, vendor in enumerate(vendors):
+        analysis[vendor] = prices[:, v]
+    for name, values in price_ranking(prices, vendors).items():
+        analysis[name] = values
+    return analysis
+
+
+# ===== COMPACT DTYPES =====
+# Labels repeat on every row: as categoricals they are one small dictionary
+# plus integer codes. Prices are downcast only when every value survives.
+INT32 = np.iinfo(np.int32)
+
+
+def downcast_prices(values):
+    series = pd.Series(values, copy=False)
+    is_price = pd.api.types.is_float_dtype(series.dtype) or pd.api.types.is_integer_dtype(series.dtype)
+    if not is_price or series.dtype in (np.int32, np.float32):
+        return series
+    x = series.to_numpy(dtype=float)
+    with np.errstate(over="ignore", invalid="ignore"):
+        if np.isfinite(x).all() and (x == np.round(x)).all() and (
+            not len(x) or (x.min() >= INT32.min and x.max() <= INT32.max)
+        ):
+            return series.astype(np.int32)
+        as32 = x.astype(np.float32)
+        if np.array_equal(as32.astype(float), x, equal_nan=True):
+            return pd.Series(as32, index=series.index, name=series.name)
+    return series
+
+
+def compact(frame, label_dtypes=None):
+    # label_dtypes: {column: CategoricalDtype} to share one dictionary across
+    # frames; a value missing from it falls back to the frame's own categories
+    label_dtypes = label_dtypes or {}
+    columns = {}
+    for col in frame.columns:
+        series = frame[col]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            columns[col] = downcast_prices(series)
+        elif isinstance(series.dtype, pd.CategoricalDtype) and col not in label_dtypes:
+            columns[col] = series
+        else:
+            shared = series.astype(label_dtypes[col]) if col in label_dtypes else None
+            if shared is None or (shared.isna() & series.notna()).any():
+                shared = pd.Series(_in_order(series), index=frame.index, name=col)
+            columns[col] = shared
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def memory_usage(frames):
+    # deep bytes of a frame or a dict of frames
+    if isinstance(frames, dict):
+        return sum(memory_usage(df) for df in frames.values())
+    return int(frames.memory_usage(deep=True).sum())
+
+
+# ===== VIEWS =====
+class TenderViews:
+    # Every table of both tabs for one upload. The long table and the cube are
+    # built on first use and shared, so each view is computed at most once.
+    # All frames are kept compact: categorical labels sharing the cube's
+    # dictionaries, prices downcast where lossless.
+    def __init__(self, tender=None, long=None):
+        # either the stacked sheets (read_tender) or their long table
+        if tender is not None:
+            self.tender = compact(tender)
+        if long is not None:
+            self.long = compact(long)
+
+    @cached_property
+    def tender(self):
+        return compact(wide_table(self.long))
+
+    @cached_property
+    def long(self):
+        return compact(long_table(self.tender))
+
+    @cached_property
+    def cube(self):
+        return price_cube(self.long)
+
+    @cached_property
+    def label_dtypes(self):
+        cube = self.cube
+        with_total = lambda index: pd.CategoricalDtype(index.append(pd.Index([TOTAL_LABEL], dtype=object)).unique())
+        vendor, scope, region = pd.CategoricalDtype(cube.vendors), with_total(cube.scopes), with_total(cube.regions)
+        return {
+            VENDOR_COL: vendor, "1st Vendor": vendor, "2nd Vendor": vendor,
+            cube.scope_col: scope, "SCOPE": scope, REGION_COL: region,
+        }
+
+    def _compact(self, frame):
+        return compact(frame, self.label_dtypes)
+
+    @cached_property
+    def merge(self):
+        return self._compact(merge_data(self.tender))
+
+    @cached_property
+    def merge_transposed(self):
+        return self._compact(merge_transposed(self.cube))
+
+    @cached_property
+    def summary(self):
+        return self._compact(tco_summary(self.cube, ORIGINAL))
+
+    @cached_property
+    def summary_transposed(self):
+        return self._compact(tco_summary(self.cube, TRANSPOSED))
+
+    @cached_property
+    def analysis(self):
+        return self._compact(bid_price_analysis(self.cube))
+
+    @cached_property
+    def analysis_transposed(self):
+        return analysis_transposed(self.analysis, self.cube.scope_col)
+
+    def sheets(self):
+        # Keyed like excel_export.SHEET_SPECS
+        return {
+            "Merge Data": self.merge,
+            "TCO Summary": self.summary,
+            "Bid & Price Analysis": self.analysis,
+            "Merge Transposed": self.merge_transposed,
+            "TCO Summary Transposed": self.summary_transposed,
+            "Bid & Price Analysis Transposed": self.analysis_transposed,
+        }
+
+
+# ===== VISUALIZATION =====
+# A handful of points per vendor, aggregated here so the charts never ship
+# the analysis rows to the browser.
+def win_rates(analysis, vendors):
+    # share of (region, scope) rows each vendor takes 1st / 2nd place in
+    n_rows = max(int(analysis["1st Vendor"].notna().sum()), 1)
+    rates = []
+    for rank in ("1st", "2nd"):
+        counts = analysis[f"{rank} Vendor"].value_counts().reindex(vendors, fill_value=0)
+        rates.append(pd.DataFrame({
+            VENDOR_COL: vendors,
+            "Rank": f"{rank} Win Rate (%)",
+            "Win Rate (%)": counts.to_numpy() / n_rows * 100,
+        }))
+    return pd.concat(rates, ignore_index=True)
+
+
+def average_gaps(analysis, vendors):
+    # mean Gap 1 to 2 (%) per 1st vendor, and over all rows as the benchmark
+    gap = analysis["Gap 1 to 2 (%)"]
+    per_vendor = gap.groupby(analysis["1st Vendor"], observed=True).mean().reindex(vendors).dropna()
+    gaps = pd.DataFrame({VENDOR_COL: per_vendor.index.astype(object), "Average Gap (%)": per_vendor.to_numpy()})
+    return gaps, float(gap.mean())
@@ -0,0 +1,413 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from dataclasses import dataclass
+from io import BytesIO
+from xlsxwriter.utility import xl_col_to_name, xl_range
+
+from formatting import lowest_two, total_row_mask
+from profiling import profiled
+
+# ===== CELL STYLE CODES =====
+# Every data cell gets one code; 0 means "plain" and is written in bulk with
+# the column's default format, everything else is a highlighted cell.
+PLAIN, FIRST, SECOND, FIRST_BOLD, SECOND_BOLD, TOTAL, BOLD = range(7)
+
+# same look as the header pandas' to_excel used to write
+HEADER_STYLE = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
+HIGHLIGHT_STYLES = {
+    PLAIN: {},
+    BOLD: {'bold': True, 'num_format': '#,##0'},
+    TOTAL: {'bold': True, 'bg_color': '#D9EAD3', 'font_color': '#1A5E20', 'num_format': '#,##0'},
+    FIRST: {'bg_color': '#C6EFCE', 'num_format': '#,##0'},
+    SECOND: {'bg_color': '#FFEB9C', 'num_format': '#,##0'},
+    FIRST_BOLD: {'bg_color': '#C6EFCE', 'bold': True, 'num_format': '#,##0'},
+    SECOND_BOLD: {'bg_color': '#FFEB9C', 'bold': True, 'num_format': '#,##0'},
+}
+
+# number format per column kind, applied on top of the highlight
+COLUMN_STYLES = {
+    "text": {},
+    "num": {'num_format': '#,##0'},
+    "pct": {'num_format': '#,##0.0"%"'},
+}
+
+# ===== HIGHLIGHT MODES =====
+# "cells": every highlighted cell is written with its own format (the look
+# is baked into the file). "conditional": plain values plus a few
+# conditional_format rules per sheet that Excel evaluates, so the highlight
+# follows later edits; viewers without conditional formatting show none.
+HIGHLIGHT_CELLS, HIGHLIGHT_CONDITIONAL = "cells", "conditional"
+EXPORT_HIGHLIGHT = os.environ.get("TCO_EXPORT_HIGHLIGHT", HIGHLIGHT_CELLS)
+
+# ===== STREAMING EXPORT =====
+# Above STREAM_MIN_CELLS the export is written row by row with constant_memory
+# and spooled to a temp file instead of being built in a BytesIO.
+STREAM_MIN_CELLS = int(os.environ.get("TCO_EXPORT_STREAM_CELLS", 1_000_000))
+SPOOL_MAX_BYTES = int(os.environ.get("TCO_EXPORT_SPOOL_MB", 32)) * 1024 * 1024
+WRITE_BLOCK_ROWS = 5_000  # rows turned into Python objects at a time
+
+# ===== AUTOFIT =====
+MAX_COLUMN_WIDTH = 255      # Excel's own limit
+WIDTH_SAMPLE_ROWS = 50_000  # text columns with more distinct values than this are sampled
+
+
+@dataclass(frozen=True)
+class SheetSpec:
+    kind: str         # "merge" | "summary" | "analysis"
+    orientation: str  # "original" | "transposed"
+
+
+SHEET_SPECS = {
+    "Merge Data": SheetSpec("merge", "original"),
+    "TCO Summary": SheetSpec("summary", "original"),
+    "Bid & Price Analysis": SheetSpec("analysis", "original"),
+    "Merge Transposed": SheetSpec("merge", "transposed"),
+    "TCO Summary Transposed": SheetSpec("summary", "transposed"),
+    "Bid & Price Analysis Transposed": SheetSpec("analysis", "transposed"),
+}
+
+
+class FormatRegistry:
+    # One xlsxwriter Format per distinct set of properties, per workbook
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formats = {}
+
+    def get(self, props):
+        if not props:
+            return None
+        key = tuple(sorted(props.items()))
+        fmt = self._formats.get(key)
+        if fmt is None:
+            fmt = self._formats[key] = self.workbook.add_format(props)
+        return fmt
+
+    def cell(self, kind, code=PLAIN):
+        return self.get({**HIGHLIGHT_STYLES[code], **COLUMN_STYLES[kind]})
+
+    def __len__(self):
+        return len(self._formats)
+
+
+def classify_columns(df):
+    # "pct" wins over "num", same as the original per-cell check
+    num_cols = set(df.select_dtypes(include=["number"]).columns)
+    kinds = []
+    for col in df.columns:
+        if "%" in str(col):
+            kinds.append("pct")
+        elif col in num_cols:
+            kinds.append("num")
+        else:
+            kinds.append("text")
+    return kinds
+
+
+def _display_width(values, kind):
+    # Width of the numbers as Excel shows them: '#,##0' or '#,##0.0"%"'
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return 0
+
+    decimals = 1 if kind == "pct" else 0
+    widths = []
+    for v in (values.min(), values.max()):
+        whole = int(abs(round(float(v), decimals)))
+        digits = len(str(whole))
+        width = digits + (digits - 1) // 3 + int(v < 0)
+        if kind == "pct":
+            width += 3  # ".0%"
+        widths.append(width)
+    return max(widths)
+
+
+def plan_column_widths(df, kinds=None, sample_rows=WIDTH_SAMPLE_ROWS):
+    # One vectorized pass per column, done once per sheet
+    if kinds is None:
+        kinds = classify_columns(df)
+
+    widths = []
+    for c, kind in enumerate(kinds):
+        series = df.iloc[:, c]
+        if kind != "text":
+            width = _display_width(pd.to_numeric(series, errors="coerce").to_numpy(dtype=float), kind)
+        else:
+            # scope / vendor labels repeat a lot, measure each distinct value once
+            values = pd.Series(series.dropna().unique())
+            if len(values) > sample_rows:
+                values = values.sample(sample_rows, random_state=0)
+            width = int(values.astype(str).str.len().max()) if len(values) else 0
+        widths.append(min(max(len(str(df.columns[c])), width) + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _style_codes(df, kinds, numeric, sheet_kind):
+    n_rows, n_cols = df.shape
+    codes = np.zeros((n_rows, n_cols), dtype=np.int8)
+    rows = np.arange(n_rows)
+    is_total = total_row_mask(df)
+
+    codes[is_total, :] = TOTAL if sheet_kind == "merge" else BOLD
+
+    # ===== 1ST / 2ND POSITION PER ROW =====
+    first = second = None
+    if sheet_kind == "summary":
+        num_pos = np.array([c for c, k in enumerate(kinds) if k != "text"], dtype=int)
+        if len(num_pos):
+            values = np.column_stack([numeric[c] for c in num_pos])
+            first_idx, second_idx = lowest_two(values)
+            first = np.where(first_idx >= 0, num_pos[first_idx], -1)
+            second = np.where(second_idx >= 0, num_pos[second_idx], -1)
+    elif sheet_kind == "analysis" and {"1st Vendor", "2nd Vendor"} <= set(df.columns):
+        col_pos = {col: c for c, col in enumerate(df.columns)}
+        # object values, so categorical vendor columns map the same way
+        first = df["1st Vendor"].astype(object).map(col_pos).fillna(-1).to_numpy(dtype=int)
+        second = df["2nd Vendor"].astype(object).map(col_pos).fillna(-1).to_numpy(dtype=int)
+
+    if first is not None:
+        ok = second >= 0
+        codes[rows[ok], second[ok]] = np.where(is_total[ok], SECOND_BOLD, SECOND)
+        ok = first >= 0
+        codes[rows[ok], first[ok]] = np.where(is_total[ok], FIRST_BOLD, FIRST)
+
+    # ===== NO HIGHLIGHT FOR ZERO (EXCEPT MERGE DATA) =====
+    if sheet_kind != "merge":
+        for c, values in numeric.items():
+            codes[values == 0, c] = PLAIN
+
+    return codes
+
+
+def _rank_rules(df, kinds, sheet_kind, n_rows):
+    # (1st formula, 2nd formula, ranges) for the ranked cells, relative to
+    # their top-left cell; None when the sheet has no ranking
+    top, last = 1, n_rows
+    if sheet_kind == "summary":
+        num_pos = [c for c, k in enumerate(kinds) if k != "text"]
+        if not num_pos:
+            return None
+        lo, hi = xl_col_to_name(num_pos[0]), xl_col_to_name(num_pos[-1])
+        cell, span, left = f"{lo}2", f"${lo}2:${hi}2", f"${lo}2:{lo}2"
+        # lowest non-zero values by SMALL() past the zeros (prices are never
+        # negative); ties go to the left-most cell, like lowest_two
+        k1 = f"SMALL({span},COUNTIF({span},0)+1)"
+        k2 = f"SMALL({span},COUNTIF({span},0)+2)"
+        first = f"AND({cell}<>0,{cell}={k1},COUNTIF({left},{cell})=1)"
+        second = f"AND({cell}<>0,{cell}={k2},COUNTIF({left},{cell})=1+({k1}={cell}))"
+        return first, second, [xl_range(top, num_pos[0], last, num_pos[-1])]
+
+    if sheet_kind == "analysis" and {"1st Vendor", "2nd Vendor"} <= set(df.columns):
+        # a vendor's price cell is highlighted when its header is the row's 1st / 2nd Vendor
+        named = set(df["1st Vendor"].dropna().astype(object)) | set(df["2nd Vendor"].dropna().astype(object))
+        vendor_pos = [c for c, col in enumerate(df.columns) if kinds[c] != "text" and col in named]
+        if not vendor_pos:
+            return None
+        columns = list(df.columns)
+        col = xl_col_to_name(vendor_pos[0])
+        cell, header = f"{col}2", f"{col}$1"
+        first_col = xl_col_to_name(columns.index("1st Vendor"))
+        second_col = xl_col_to_name(columns.index("2nd Vendor"))
+        # contiguous runs of vendor columns, one range each
+        runs = np.split(np.array(vendor_pos), np.flatnonzero(np.diff(vendor_pos) != 1) + 1)
+        return (
+            f"AND({cell}<>0,{header}=${first_col}2)",
+            f"AND({cell}<>0,{header}=${second_col}2)",
+            [xl_range(top, int(run[0]), last, int(run[-1])) for run in runs],
+        )
+    return None
+
+
+def add_highlight_rules(worksheet, df, kinds, sheet_kind, registry):
+    # The _style_codes highlighting as conditional_format rules. Rules are
+    # added most specific first and stop there, so a TOTAL row's 1st place
+    # gets FIRST_BOLD and not FIRST plus BOLD.
+    n_rows, n_cols = df.shape
+    if not n_rows:
+        return
+
+    text_cols = [xl_col_to_name(c) for c, k in enumerate(kinds) if k == "text"]
+    # a row is a TOTAL row if any text cell says TOTAL (= ignores case)
+    total = "OR(" + ",".join(f'TRIM(${col}2)="TOTAL"' for col in text_cols) + ")" if text_cols else None
+
+    def rule(ranges, formula, code):
+        props = {k: v for k, v in HIGHLIGHT_STYLES[code].items() if k != "num_format"}
+        options = {"type": "formula", "criteria": f"={formula}", "format": registry.get(props), "stop_if_true": True}
+        if len(ranges) > 1:
+            options["multi_range"] = " ".join(ranges)
+        worksheet.conditional_format(ranges[0], options)
+
+    ranks = _rank_rules(df, kinds, sheet_kind, n_rows) if sheet_kind != "merge" else None
+    if ranks:
+        first, second, ranges = ranks
+        if total:
+            rule(ranges, f"AND({total},{first})", FIRST_BOLD)
+            rule(ranges, f"AND({total},{second})", SECOND_BOLD)
+        rule(ranges, first, FIRST)
+        rule(ranges, second, SECOND)
+    if total:
+        if sheet_kind == "merge":
+            rule([xl_range(1, 0, n_rows, n_cols - 1)], total, TOTAL)
+        else:
+            # zeros stay plain outside Merge Data, text cells are never 0
+            rule([xl_range(1, 0, n_rows, n_cols - 1)], f"AND({total},A2<>0)", BOLD)
+
+
+def _write_columns(worksheet, df, kinds, numeric, codes, registry):
+    # column by column, plain cells in bulk
+    write_number = worksheet.write_number
+    write = worksheet.write
+
+    for c, kind in enumerate(kinds):
+        col_codes = codes[:, c]
+        formats = {code: registry.cell(kind, code) for code in np.unique(col_codes).tolist()}
+        default = registry.cell(kind)
+
+        if kind != "text":
+            values = numeric[c]
+            # NaN / inf stay blank
+            keep = np.isfinite(values)
+            rows = np.flatnonzero(keep & (col_codes == PLAIN))
+            for r, v in zip((rows + 1).tolist(), values[rows].tolist()):
+                write_number(r, c, v, default)
+            rows = np.flatnonzero(keep & (col_codes != PLAIN))
+            for r, v, code in zip((rows + 1).tolist(), values[rows].tolist(), col_codes[rows].tolist()):
+                write_number(r, c, v, formats[code])
+        else:
+            values = df.iloc[:, c].to_numpy(dtype=object)
+            keep = ~pd.isna(values)
+            rows = np.flatnonzero(keep & (col_codes == PLAIN))
+            # contiguous plain runs go out as whole columns
+            if len(rows):
+                breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+                for run in np.split(rows, breaks):
+                    worksheet.write_column(run[0] + 1, c, values[run[0]:run[-1] + 1].tolist(), default)
+            rows = np.flatnonzero(keep & (col_codes != PLAIN))
+            for r, v, code in zip((rows + 1).tolist(), values[rows].tolist(), col_codes[rows].tolist()):
+                write(r, c, v, formats[code])
+
+
+def _write_rows(worksheet, df, kinds, numeric, codes, registry, block_rows=WRITE_BLOCK_ROWS):
+    # constant_memory flushes a row as soon as a later one is started, so every
+    # row goes out complete and in order. Cells become Python objects one
+    # block of rows at a time.
+    columns = []
+    for c, kind in enumerate(kinds):
+        if kind != "text":
+            values = numeric[c]
+            keep = np.isfinite(values)
+            write = worksheet.write_number
+        else:
+            values = df.iloc[:, c].to_numpy(dtype=object)
+            keep = ~pd.isna(values)
+            write = worksheet.write
+        formats = {code: registry.cell(kind, code) for code in np.unique(codes[:, c]).tolist()}
+        columns.append((c, write, values, keep, codes[:, c], formats))
+
+    for start in range(0, len(df), block_rows):
+        stop = min(start + block_rows, len(df))
+        block = [
+            (c, write, values[start:stop].tolist(), keep[start:stop].tolist(), col_codes[start:stop].tolist(), formats)
+            for c, write, values, keep, col_codes, formats in columns
+        ]
+        for i in range(stop - start):
+            r = start + i + 1
+            for c, write, values, keep, col_codes, formats in block:
+                if keep[i]:
+                    write(r, c, values[i], formats[col_codes[i]])
+
+
+def render_sheet(worksheet, df, spec, registry, highlight=HIGHLIGHT_CELLS, row_order=False):
+    # row_order: write each row complete, top to bottom (constant_memory needs it)
+    kinds = classify_columns(df)
+    sheet_kind = spec.kind if spec else None
+
+    # ===== HEADER =====
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], registry.get(HEADER_STYLE))
+
+    # numeric columns converted once per sheet, not once per cell
+    numeric = {
+        c: pd.to_numeric(df.iloc[:, c], errors="coerce").to_numpy(dtype=float)
+        for c, kind in enumerate(kinds) if kind != "text"
+    }
+    if highlight == HIGHLIGHT_CONDITIONAL:
+        # plain values only, the rules below do the highlighting
+        codes = np.zeros(df.shape, dtype=np.int8)
+    else:
+        codes = _style_codes(df, kinds, numeric, sheet_kind)
+
+    if row_order:
+        _write_rows(worksheet, df, kinds, numeric, codes, registry)
+    else:
+        _write_columns(worksheet, df, kinds, numeric, codes, registry)
+
+    if highlight == HIGHLIGHT_CONDITIONAL:
+        add_highlight_rules(worksheet, df, kinds, sheet_kind, registry)
+
+    # ===== AUTOFIT =====
+    for i, width in enumerate(plan_column_widths(df, kinds)):
+        worksheet.set_column(i, i, width)
+
+
+def _write_workbook(workbook, selected_sheets, df_dict, specs, highlight, row_order=False):
+    highlight = highlight or EXPORT_HIGHLIGHT
+    if highlight not in (HIGHLIGHT_CELLS, HIGHLIGHT_CONDITIONAL):
+        raise ValueError(f"Unknown highlight mode {highlight!r}, expected '{HIGHLIGHT_CELLS}' or '{HIGHLIGHT_CONDITIONAL}'.")
+    registry = FormatRegistry(workbook)
+
+    for sheet in selected_sheets:
+        worksheet = workbook.add_worksheet(sheet)
+        render_sheet(worksheet, df_dict[sheet], specs.get(sheet), registry, highlight, row_order)
+
+
+# Fungsi "Super Button" & Formatting
+@profiled("excel_export")
+def generate_multi_sheet_excel(selected_sheets, df_dict, specs=SHEET_SPECS, highlight=None):
+    # Works for both tabs: the sheet name picks its spec (unknown names only get bold TOTAL rows).
+    # highlight: HIGHLIGHT_CELLS or HIGHLIGHT_CONDITIONAL, default EXPORT_HIGHLIGHT
+    output = BytesIO()
+
+    with xlsxwriter.Workbook(output, {'in_memory': True}) as workbook:
+        _write_workbook(workbook, selected_sheets, df_dict, specs, highlight)
+
+    output.seek(0)
+    return output.getvalue()
+
+
+@profiled("excel_export")
+def stream_multi_sheet_excel(selected_sheets, df_dict, specs=SHEET_SPECS, highlight=None,
+                             spool_bytes=SPOOL_MAX_BYTES):
+    # Same workbook as generate_multi_sheet_excel, for exports too big to hold
+    # twice. constant_memory keeps one row per sheet in memory (rows go to temp
+    # files), and the .xlsx is spooled: in memory up to spool_bytes, on disk
+    # past that. Returns the spool rewound to 0; closing it deletes it.
+    output = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+    try:
+        with xlsxwriter.Workbook(output, {'constant_memory': True}) as workbook:
+            _write_workbook(workbook, selected_sheets, df_dict, specs, highlight, row_order=True)
+    except BaseException:
+        output.close()
+        raise
+    output.seek(0)
+    return output
+
+
+def export_cells(selected_sheets, df_dict):
+    # cells the selected sheets would write, to choose between the two writers
+    return sum(df_dict[sheet].size for sheet in selected_sheets)
+
+
+def frames_fingerprint(selected_sheets, df_dict):
+    # Content hash of the selected frames, in selection order (order changes the workbook)
+    h = hashlib.sha1()
+    for sheet in selected_sheets:
+        df = df_dict[sheet]
+        h.update(repr((sheet, list(df.columns), df.dtypes.astype(str).tolist())).encode())
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
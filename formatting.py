@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+
+
+def format_rupiah(x):
+    if pd.isna(x):
+        return ""
+    # pastikan bisa diubah ke float
+    try:
+        x = float(x)
+    except:
+        return x  # biarin apa adanya kalau bukan angka
+
+    # kalau tidak punya desimal (misal 7000.0), tampilkan tanpa ,00
+    if x.is_integer():
+        formatted = f"{int(x):,}".replace(",", ".")
+    else:
+        formatted = f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        # hapus ,00 kalau desimalnya 0 semua (misal 7000,00 → 7000)
+        if formatted.endswith(",00"):
+            formatted = formatted[:-3]
+    return formatted
+
+
+# floats below 2**53 are exact integers; x*100 must stay below it too
+_MAX_WHOLE = 2.0 ** 53
+_MAX_CENTS = 2.0 ** 53 / 100
+
+
+def _rupiah_text(whole, cents, show_cents, negative):
+    # Builds "-1.234.567,89" for whole arrays of int64 at once: characters are
+    # written right-to-left into a byte matrix, then flipped into place.
+    n = len(whole)
+    n_digits = np.ones(n, dtype=np.int64)
+    t = whole // 10
+    while (t > 0).any():
+        n_digits += t > 0
+        t //= 10
+    length = n_digits + (n_digits - 1) // 3 + 3 * show_cents + negative
+    width = int(length.max()) if n else 1
+
+    rev = np.zeros((n, width), dtype=np.uint8)
+    rows = np.arange(n)
+
+    # rows with and without ",xx" are done separately so every digit lands
+    # in the same column of the block
+    for with_cents in (False, True):
+        sel = np.flatnonzero(show_cents == with_cents)
+        if not len(sel):
+            continue
+        block = np.zeros((len(sel), width), dtype=np.uint8, order="F")
+        offset = 0
+        if with_cents:
+            block[:, 0] = ord("0") + cents[sel] % 10
+            block[:, 1] = ord("0") + cents[sel] // 10
+            block[:, 2] = ord(",")
+            offset = 3
+
+        t = whole[sel]
+        digits = n_digits[sel]
+        for k in range(int(digits.max())):
+            has = k < digits
+            pos = offset + k + k // 3
+            block[:, pos] = np.where(has, ord("0") + t % 10, 0)
+            if k and k % 3 == 0:
+                block[:, pos - 1] = np.where(has, ord("."), 0)
+            t = t // 10
+        rev[sel] = block
+
+    rev[rows[negative], length[negative] - 1] = ord("-")
+
+    # flip: character p of the result is character (length - 1 - p) from the right
+    src = length[:, None] - 1 - np.arange(width)
+    text = np.where(src >= 0, np.take_along_axis(rev, np.clip(src, 0, None), axis=1), 0)
+    return np.ascontiguousarray(text, dtype=np.uint8).view(f"S{width}").ravel().astype(str)
+
+
+def format_rupiah_series(values):
+    # Vectorized format_rupiah: same strings, whole column at once
+    series = pd.Series(values, copy=False)
+    raw = series.to_numpy(dtype=object)
+    out = raw.copy()
+
+    missing = pd.isna(raw)
+    out[missing] = ""
+
+    x = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    converted = ~missing & ~np.isnan(x)
+    finite = converted & np.isfinite(x)
+    a = np.abs(np.where(finite, x, 0))
+
+    # ===== INTEGER VALUES (tanpa ,00) =====
+    is_int = finite & (x == np.floor(x)) & (a < _MAX_WHOLE)
+
+    # ===== DECIMAL VALUES =====
+    # "%.2f" rounds the exact binary value; x*100 can only disagree with it
+    # when it lands (almost) exactly on a .5 tie, those go through format_rupiah
+    c = a * 100
+    near_tie = np.abs(c - np.floor(c) - 0.5) <= 4 * np.spacing(c)
+    is_dec = finite & ~is_int & (a < _MAX_CENTS) & ~near_tie
+
+    vector = is_int | is_dec
+    if vector.any():
+        cents_total = np.where(is_dec, np.rint(c), a * 100)[vector].astype(np.int64)
+        cents = cents_total % 100
+        show_cents = is_dec[vector] & (cents != 0)
+        negative = np.where(is_dec, np.signbit(x), x <= -1)[vector]
+        out[vector] = _rupiah_text(cents_total // 100, cents, show_cents, negative)
+
+    # inf / huge numbers / ties / odd inputs keep the scalar path
+    rest = converted & ~vector
+    unconverted = np.flatnonzero(~missing & ~converted)
+    rest[unconverted] = [_is_float_like(raw[i]) for i in unconverted]
+    for i in np.flatnonzero(rest):
+        out[i] = format_rupiah(raw[i])
+
+    return pd.Series(out, index=series.index, name=series.name, dtype=object)
+
+
+def _is_float_like(x):
+    # strings such as "nan" or "1e3" that float() accepts but to_numeric may not
+    try:
+        float(x)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def rupiah_formatter(values):
+    # Styler.format still calls one function per cell; format the distinct
+    # values of the column once and make that call a dict lookup.
+    unique = pd.unique(pd.Series(values).dropna())
+    table = dict(zip(unique.tolist(), format_rupiah_series(unique).tolist()))
+
+    def formatter(x):
+        try:
+            return table[x]
+        except (KeyError, TypeError):
+            return format_rupiah(x)
+
+    return formatter
+
+
+# ===== TABLE STYLING =====
+# Styler.apply(..., axis=None) callbacks: the whole CSS matrix in one pass
+TOTAL_CSS = "font-weight: bold; background-color: #D9EAD3; color: #1A5E20;"
+BOLD_CSS = "font-weight: bold;"
+FIRST_CSS = "background-color: #C6EFCE; color: #006100;"
+SECOND_CSS = "background-color: #FFEB9C; color: #9C6500;"
+
+
+def total_row_mask(df):
+    # A row is a TOTAL row if any non-numeric cell says "TOTAL"
+    mask = np.zeros(len(df), dtype=bool)
+    for c in np.flatnonzero(~df.dtypes.map(pd.api.types.is_numeric_dtype).to_numpy(dtype=bool)):
+        mask |= df.iloc[:, c].astype(str).str.strip().str.upper().eq("TOTAL").to_numpy()
+    return mask
+
+
+def lowest_two(values):
+    # 1st & 2nd lowest column position per row, ignoring 0 (vendor tidak ikut tender) and NaN.
+    # -1 when there is no such vendor; ties go to the left-most column.
+    values = np.asarray(values, dtype=float)
+    n_rows, n_cols = values.shape
+    first = np.full(n_rows, -1)
+    second = np.full(n_rows, -1)
+    if n_cols == 0:
+        return first, second
+
+    masked = np.where(np.isfinite(values) & (values != 0), values, np.inf)
+    if n_cols == 1:
+        first[np.isfinite(masked[:, 0])] = 0
+        return first, second
+
+    # argpartition gives the two smallest values (unordered) without a full sort
+    pair = np.sort(np.take_along_axis(masked, np.argpartition(masked, 1, axis=1)[:, :2], axis=1), axis=1)
+    low, next_low = pair[:, 0], pair[:, 1]
+
+    # ties go to the left-most column
+    cols = np.arange(n_cols)
+    lo = np.argmax(masked == low[:, None], axis=1)
+    hi = np.argmax((masked == next_low[:, None]) & (cols != lo[:, None]), axis=1)
+
+    ok = np.isfinite(low)
+    first[ok] = lo[ok]
+    ok = np.isfinite(next_low)
+    second[ok] = hi[ok]
+    return first, second
+
+
+def _styles(df):
+    return np.full(df.shape, "", dtype=object)
+
+
+def _as_frame(styles, df):
+    return pd.DataFrame(styles, index=df.index, columns=df.columns)
+
+
+def style_total(df, css=TOTAL_CSS):
+    styles = _styles(df)
+    styles[total_row_mask(df)] = css
+    return _as_frame(styles, df)
+
+
+def _mark(styles, first, second):
+    rows = np.arange(len(styles))
+    ok = second >= 0
+    styles[rows[ok], second[ok]] = SECOND_CSS
+    ok = first >= 0
+    styles[rows[ok], first[ok]] = FIRST_CSS
+
+
+def style_rank(df, num_cols):
+    # 1st / 2nd lowest across num_cols, zeros excluded
+    styles = _styles(df)
+    pos = df.columns.get_indexer(num_cols)
+    first, second = lowest_two(df[num_cols].to_numpy(dtype=float))
+    _mark(styles, np.where(first >= 0, pos[first], -1), np.where(second >= 0, pos[second], -1))
+    return _as_frame(styles, df)
+
+
+def style_vendor_rank(df):
+    # highlights the columns named in "1st Vendor" / "2nd Vendor"
+    styles = _styles(df)
+    first = df.columns.get_indexer(df["1st Vendor"])
+    second = df.columns.get_indexer(df["2nd Vendor"])
+    _mark(styles, first, second)
+    return _as_frame(styles, df)
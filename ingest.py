@@ -0,0 +1,246 @@
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from profiling import profiled
+
+VENDOR_COL = "VENDOR"
+# bump when parsing rules change, cached parses of older versions are ignored
+PARSER_VERSION = 1
+
+# ===== PARALLEL PARSING =====
+# 0 / unset = one worker per CPU; 1 = always serial
+INGEST_WORKERS = int(os.environ.get("TCO_INGEST_WORKERS", 0)) or os.cpu_count() or 1
+# below this the pool costs more than it saves
+PARALLEL_MIN_BYTES = 1_000_000
+PARALLEL_MIN_SHEETS = 4
+
+
+def _is_empty(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+# openpyxl hands back plain int / float for numeric cells (bool is its own type)
+NUMBER_TYPES = (int, float, np.integer, np.floating)
+
+
+def _is_number(value):
+    return type(value) in NUMBER_TYPES or (isinstance(value, NUMBER_TYPES) and not isinstance(value, bool))
+
+
+def table_rows(rows):
+    # Floating table: the first non-empty row is the header, its first and
+    # last filled cells give the column span. Yields the header, then every
+    # non-empty data row padded to its width. Rows are consumed lazily, so the
+    # grid around the table is never materialised.
+    rows = iter(rows)
+    for row in rows:
+        filled = [i for i, v in enumerate(row) if not _is_empty(v)]
+        if filled:
+            start, stop = filled[0], filled[-1] + 1
+            yield [str(v).strip() if v is not None else "" for v in row[start:stop]]
+            break
+    else:
+        return
+
+    width = stop - start
+    for row in rows:
+        cells = tuple(row[start:stop])
+        if cells.count(None) == len(cells) or all(_is_empty(v) for v in cells):
+            continue
+        yield cells + (None,) * (width - len(cells))
+
+
+def find_table(rows):
+    # (header, data rows) of the table, ([], []) for an empty sheet
+    rows = table_rows(rows)
+    header = next(rows, [])
+    return header, list(rows)
+
+
+def split_columns(header, data):
+    # Non-numeric columns first, numeric after (constraint 1): the split is the
+    # first column holding only numbers, everything right of it must be numeric.
+    for c in range(len(header)):
+        values = [v for v in (row[c] for row in data) if v is not None]
+        if any(_is_number(v) for v in values) and all(_is_number(v) or _is_empty(v) for v in values):
+            break
+    else:
+        return len(header)
+
+    check_numeric(header, data, c + 1)
+    return c
+
+
+def check_numeric(header, data, start):
+    # columns from start on must hold numbers only
+    for k in range(start, len(header)):
+        bad = [v for v in (row[k] for row in data) if v is not None and not _is_number(v) and not _is_empty(v)]
+        if bad:
+            raise ValueError(
+                f"Column '{header[k]}' has non-numeric values after the numeric columns "
+                f"started (e.g. {bad[0]!r}). Columns must be ordered Non-Numeric → Numeric."
+            )
+
+
+def parse_sheet(rows):
+    # rows: iterable of row tuples -> DataFrame(labels as object, prices as float64)
+    header, data = find_table(rows)
+    if not header:
+        return pd.DataFrame()
+    return table_frame(header, data, split_columns(header, data))
+
+
+def table_frame(header, data, n_labels):
+    # the first n_labels columns as object, the rest as float64 (empty -> NaN)
+    columns = list(zip(*data)) if data else [()] * len(header)
+
+    frame = {}
+    for c, name in enumerate(header):
+        if c < n_labels:
+            frame[name] = pd.Series(columns[c], dtype=object)
+        else:
+            frame[name] = pd.Series(
+                [np.nan if _is_empty(v) else v for v in columns[c]], dtype=float
+            )
+    return pd.DataFrame(frame)
+
+
+def iter_sheets(source):
+    # (sheet name, row iterator) per sheet; the workbook is opened once
+    name = getattr(source, "name", source if isinstance(source, str) else "")
+    if str(name).lower().endswith(".xls"):
+        # openpyxl can't read legacy .xls, pandas (xlrd) can
+        for sheet, df in pd.read_excel(source, sheet_name=None, header=None).items():
+            yield sheet, df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        return
+
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        for ws in workbook.worksheets:
+            # the stored dimension can be stale, read the real extent
+            ws.reset_dimensions()
+            yield ws.title, ws.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def check_structure(sheets):
+    # Every sheet must have the same columns (names and order)
+    reference_name, reference = next(iter(sheets.items()))
+    for name, df in sheets.items():
+        if list(df.columns) != list(reference.columns):
+            raise ValueError(
+                f"Sheet '{name}' has columns {list(df.columns)}, "
+                f"expected {list(reference.columns)} as in sheet '{reference_name}'."
+            )
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def sheet_names(data):
+    # Worksheet order straight from xl/workbook.xml, without openpyxl reading
+    # shared strings. Chart sheets are left out, like workbook.worksheets does.
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    kinds = {el.get("Id"): el.get("Type", "").rsplit("/", 1)[-1] for el in rels}
+
+    def kind(sheet):
+        # r:id, whichever relationships namespace (transitional / strict) the file uses
+        rid = next((v for k, v in sheet.attrib.items() if k.endswith("}id")), None)
+        return kinds.get(rid)
+
+    return [el.get("name") for el in root.iter() if el.tag.endswith("}sheet") and kind(el) == "worksheet"]
+
+
+def _parse_sheets(data, names):
+    # Worker: open the workbook once, parse a run of sheets
+    workbook = load_workbook(BytesIO(data), read_only=True, data_only=True)
+    try:
+        parsed = []
+        for name in names:
+            ws = workbook[name]
+            ws.reset_dimensions()
+            parsed.append((name, parse_sheet(ws.iter_rows(values_only=True))))
+        return parsed
+    finally:
+        workbook.close()
+
+
+_pools = {}
+
+
+def _get_pool(workers):
+    # One long-lived pool per size. "spawn" because the Streamlit server is
+    # multi-threaded and forking it is not safe.
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return pool
+
+
+def read_sheets(source, workers=None):
+    # {vendor (sheet name): parsed table}, empty sheets skipped
+    if workers is None:
+        workers = INGEST_WORKERS
+    name = getattr(source, "name", source if isinstance(source, str) else "")
+
+    parsed = None
+    if workers > 1 and not str(name).lower().endswith(".xls"):
+        data = _read_bytes(source)
+        names = sheet_names(data)
+        if len(data) >= PARALLEL_MIN_BYTES and len(names) >= PARALLEL_MIN_SHEETS:
+            # contiguous runs keep the original sheet order when gathered
+            runs = [list(run) for run in np.array_split(np.array(names, dtype=object), min(workers, len(names)))]
+            results = _get_pool(workers).map(_parse_sheets, [data] * len(runs), runs)
+            parsed = [item for run in results for item in run]
+        else:
+            source = BytesIO(data)
+
+    if parsed is None:
+        parsed = ((sheet, parse_sheet(rows)) for sheet, rows in iter_sheets(source))
+
+    return {sheet: df for sheet, df in parsed if not df.empty}
+
+
+def stack_sheets(sheets):
+    # One columnar frame: VENDOR + non-numeric columns + numeric columns.
+    # Same errors as StreamingTender for a workbook the views can't work with.
+    if not sheets:
+        raise ValueError("The workbook has no vendor sheet with data.")
+    check_structure(sheets)
+    name, first = next(iter(sheets.items()))
+    if pd.api.types.is_numeric_dtype(first.dtypes.iloc[0]):
+        raise ValueError(f"Sheet '{name}' has no scope column before the price columns.")
+
+    frame = pd.concat(sheets.values(), ignore_index=True)
+    vendors = np.repeat(list(sheets), [len(df) for df in sheets.values()])
+    frame.insert(0, VENDOR_COL, vendors.astype(object))
+    return frame
+
+
+@profiled("ingest")
+def read_tender(source, workers=None):
+    # source: path, file-like (e.g. st.file_uploader) or bytes
+    return stack_sheets(read_sheets(source, workers))
@@ -0,0 +1,115 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# TCO_PROFILE=1 profiles every run; otherwise a session can switch it on for
+# itself (the app does that for ?debug=1). Off, a stage costs one attribute check.
+PROFILE_ALL = os.environ.get("TCO_PROFILE") == "1"
+STAGE_LOG = os.environ.get("TCO_STAGE_LOG", "tco_stages.jsonl")
+
+_local = threading.local()
+_log_lock = threading.Lock()
+# stages running in any thread; tracemalloc slows every allocation, so it is
+# stopped again when the last one finishes
+_active = 0
+_active_lock = threading.Lock()
+
+
+def begin_run(enabled=False):
+    # Called at the top of a script run: fresh records for this session's thread
+    _local.enabled = enabled or PROFILE_ALL
+    _local.records = []
+    _local.stack = []
+
+
+def enabled():
+    return getattr(_local, "enabled", PROFILE_ALL)
+
+
+def records():
+    return list(getattr(_local, "records", []))
+
+
+def shape_of(obj):
+    # "rows x cols" of a frame, total cells of a dict of frames, size of bytes
+    if hasattr(obj, "shape"):
+        return "x".join(str(n) for n in obj.shape)
+    if isinstance(obj, dict) and all(hasattr(v, "size") for v in obj.values()):
+        return f"{len(obj)} frames, {sum(v.size for v in obj.values()):,} cells"
+    if isinstance(obj, (bytes, bytearray)):
+        return f"{len(obj):,} bytes"
+    return None
+
+
+def _write(record):
+    try:
+        with _log_lock, open(STAGE_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        pass   # logging must never break the app
+
+
+@contextmanager
+def stage(name, data=None):
+    # Wall time, peak traced memory and shapes of one pipeline stage. Stages can
+    # nest; tracemalloc is process-wide, so peaks overlap when sessions run at once.
+    if not enabled():
+        yield {}
+        return
+
+    global _active
+    with _active_lock:
+        _active += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    stack = _local.__dict__.setdefault("stack", [])
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1]["peak_seen"] = max(stack[-1]["peak_seen"], peak)
+    tracemalloc.reset_peak()
+    frame = {"start": current, "peak_seen": current}
+    stack.append(frame)
+
+    record = {"stage": name, "input": shape_of(data) if data is not None else None}
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        frame["peak_seen"] = max(frame["peak_seen"], peak)
+        stack.pop()
+        if stack:
+            stack[-1]["peak_seen"] = max(stack[-1]["peak_seen"], frame["peak_seen"])
+        with _active_lock:
+            _active -= 1
+            if not _active:
+                tracemalloc.stop()
+
+        record.update({
+            "seconds": round(seconds, 4),
+            "peak_mb": round(max(frame["peak_seen"] - frame["start"], 0) / 2**20, 2),
+            "depth": len(stack),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        _local.__dict__.setdefault("records", []).append(record)
+        _write(record)
+
+
+def profiled(name):
+    # Decorator: the first argument is the stage input, the return value its output
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return fn(*args, **kwargs)
+            with stage(name, args[0] if args else None) as record:
+                result = fn(*args, **kwargs)
+                record["output"] = shape_of(result)
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,296 @@
+import itertools
+import os
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from engine import (ORIGINAL, REGION_COL, TOTAL_LABEL, PriceCube, analysis_frame, analysis_transposed,
+                    summary_frame)
+from ingest import VENDOR_COL, check_numeric, iter_sheets, split_columns, table_frame, table_rows
+from profiling import profiled
+
+# ===== OUT-OF-CORE TENDERS =====
+# For vendor sheets too long to hold as one DataFrame. Rows are parsed a
+# chunk at a time; what stays in memory is one total per (vendor, scope) and
+# per (vendor, region) plus the scope labels, whatever the sheet length.
+CHUNK_ROWS = int(os.environ.get("TCO_CHUNK_ROWS", 20_000))
+# spill files (parsed rows, price cube); unset = the system temp dir
+SPILL_DIR = os.environ.get("TCO_SPILL_DIR") or None
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+
+def _text(series):
+    # labels are spilled as Arrow strings; a number typed into a label
+    # column comes back as its text
+    return series.where(series.isna(), series.astype(str)).astype(object)
+
+
+class StreamingTender:
+    # Sheets are added one after the other (add_sheet). Each chunk updates the
+    # TCO summary totals and is appended to an Arrow IPC stream on disk; finish()
+    # scatters the spilled rows into a memory-mapped vendor x scope x region
+    # cube. The analysis is then computed from the cube a chunk of rows at a
+    # time, and the merged table is only read back when asked for.
+    def __init__(self, chunk_rows=CHUNK_ROWS, directory=SPILL_DIR):
+        self.chunk_rows = chunk_rows
+        self.directory = Path(tempfile.mkdtemp(prefix="tco-stream-", dir=directory))
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+        self.header = None
+        self.n_labels = None
+        self.vendors = []
+        self.n_rows = []          # data rows per vendor
+        self._scopes = {}         # scope label -> code, in order of first appearance
+        self._scope_totals = []   # per vendor: total per scope code seen so far
+        self._region_totals = []  # per vendor: total per region
+        self._sink = None
+        self._writer = None
+        self.cube = None
+
+    # ----- ingest -----
+    @property
+    def labels(self):
+        return self.header[:self.n_labels]
+
+    @property
+    def regions(self):
+        return self.header[self.n_labels:]
+
+    @property
+    def scope_col(self):
+        return self.header[0]
+
+    @property
+    def spill_path(self):
+        return self.directory / "rows.arrow"
+
+    def add_sheet(self, vendor, rows):
+        # rows: row tuples of one vendor sheet, e.g. ws.iter_rows(values_only=True)
+        if self.cube is not None:
+            raise RuntimeError("finish() was already called, no more sheets can be added.")
+        rows = table_rows(rows)
+        header = next(rows, None)
+        chunks = _chunks(rows, self.chunk_rows)
+        first = next(chunks, None)
+        if not header or first is None:
+            return   # empty sheet, skipped like read_sheets does
+
+        if self.header is None:
+            # the first chunk of the first sheet decides label vs price columns
+            n_labels = split_columns(header, first)
+            if n_labels == 0:
+                raise ValueError(f"Sheet '{vendor}' has no scope column before the price columns.")
+            self.header, self.n_labels = header, n_labels
+        elif header != self.header:
+            raise ValueError(
+                f"Sheet '{vendor}' has columns {header}, "
+                f"expected {self.header} as in sheet '{self.vendors[0]}'."
+            )
+
+        scope_totals = np.zeros(0)
+        region_totals = np.zeros(len(self.regions))
+        n_rows = 0
+        for data in itertools.chain([first], chunks):
+            check_numeric(self.header, data, self.n_labels)
+            frame = table_frame(self.header, data, self.n_labels)
+            for col in self.labels:
+                frame[col] = _text(frame[col])
+            codes = self._scope_codes(frame[self.scope_col])
+            prices = frame[self.regions].to_numpy(dtype=float)
+
+            ok = codes >= 0
+            totals = np.bincount(
+                codes[ok], weights=np.nansum(prices[ok], axis=1), minlength=len(self._scopes)
+            )
+            scope_totals = np.concatenate([scope_totals, np.zeros(len(totals) - len(scope_totals))]) + totals
+            region_totals += np.nansum(prices[ok], axis=0)
+            n_rows += len(frame)
+
+            frame.insert(0, VENDOR_COL, vendor)
+            self._spill(frame)
+
+        self.vendors.append(vendor)
+        self.n_rows.append(n_rows)
+        self._scope_totals.append(scope_totals)
+        self._region_totals.append(region_totals)
+
+    def _scope_codes(self, labels):
+        # code per row, new labels appended; a row without a scope gets -1
+        # and is left out of the cube, as price_cube drops it
+        scopes = self._scopes
+        return np.fromiter(
+            (scopes.setdefault(label, len(scopes)) if label is not None else -1 for label in labels),
+            dtype=np.intp, count=len(labels),
+        )
+
+    def _spill(self, frame):
+        if self._writer is None:
+            self._schema = pa.schema(
+                [(VENDOR_COL, pa.string())]
+                + [(col, pa.string()) for col in self.labels]
+                + [(col, pa.float64()) for col in self.regions]
+            )
+            self._sink = pa.OSFile(str(self.spill_path), "wb")
+            self._writer = pa.ipc.new_stream(self._sink, self._schema)
+        self._writer.write_batch(pa.RecordBatch.from_pandas(frame, schema=self._schema, preserve_index=False))
+
+    def _batches(self):
+        # spilled chunks in the order they were added, one vendor per chunk
+        if not self.spill_path.exists():
+            return
+        with pa.memory_map(str(self.spill_path)) as source:
+            yield from pa.ipc.open_stream(source)
+
+    @profiled("cube")
+    def finish(self):
+        # Close the spill and build the cube from it, one chunk at a time. The
+        # cube is a .npy memory map: pages are read from disk as views need them.
+        if self.cube is not None:
+            return self
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+        if self.header is None:
+            raise ValueError("The workbook has no vendor sheet with data.")
+
+        shape = (len(self.vendors), len(self._scopes), len(self.regions))
+        values = np.lib.format.open_memmap(self.directory / "cube.npy", mode="w+", dtype=float, shape=shape)
+        vendor_codes = {vendor: v for v, vendor in enumerate(self.vendors)}
+        for batch in self._batches():
+            frame = batch.to_pandas()
+            v = vendor_codes[frame[VENDOR_COL].iat[0]]
+            codes = self._scope_codes(frame[self.scope_col])
+            ok = codes >= 0
+            codes = codes[ok]
+            prices = np.nan_to_num(frame[self.regions].to_numpy(dtype=float)[ok], nan=0.0)
+            # repeated scopes are summed, like the bincount in price_cube
+            if len(np.unique(codes)) == len(codes):
+                values[v, codes] += prices
+            else:
+                np.add.at(values[v], codes, prices)
+        values.flush()
+
+        self.cube = PriceCube(
+            values, pd.Index(self.vendors, dtype=object), pd.Index(list(self._scopes), dtype=object),
+            pd.Index(self.regions, dtype=object), self.scope_col,
+        )
+        return self
+
+    # ----- views -----
+    def summary(self, orientation=ORIGINAL):
+        # Same frame as engine.tco_summary, from the totals kept while reading
+        region_totals = np.vstack(self._region_totals)
+        if orientation == ORIGINAL:
+            n_scopes = len(self._scopes)
+            values = np.vstack([np.pad(t, (0, n_scopes - len(t))) for t in self._scope_totals])
+            label, index = self.scope_col, pd.Index(list(self._scopes), dtype=object)
+        else:
+            values, label, index = region_totals, REGION_COL, pd.Index(self.regions, dtype=object)
+        return summary_frame(label, index, values, region_totals.sum(axis=1), pd.Index(self.vendors, dtype=object))
+
+    def iter_analysis(self, orientation=ORIGINAL, chunk_rows=None):
+        # Bid & Price Analysis in chunks of about chunk_rows rows; concatenated
+        # they equal engine.bid_price_analysis / analysis_transposed
+        cube = self.finish().cube
+        chunk_rows = chunk_rows or self.chunk_rows
+        n_vendors, n_scopes, n_regions = cube.shape
+        vendors = cube.vendors.tolist()
+        scopes = cube.scopes.to_numpy()
+
+        if orientation == ORIGINAL:
+            for r, region in enumerate(cube.regions):
+                for start in range(0, n_scopes, chunk_rows):
+                    stop = min(start + chunk_rows, n_scopes)
+                    prices = np.asarray(cube.values[:, start:stop, r]).T
+                    frame = analysis_frame(
+                        np.repeat(np.array([region], dtype=object), stop - start), scopes[start:stop],
+                        prices, vendors, cube.scope_col,
+                    )
+                    frame.index = pd.RangeIndex(r * n_scopes + start, r * n_scopes + stop)
+                    yield frame
+            return
+
+        # scope-major: a block of scopes with all their regions, reordered the
+        # same way analysis_transposed reorders the whole table
+        step = max(chunk_rows // max(n_regions, 1), 1)
+        for start in range(0, n_scopes, step):
+            stop = min(start + step, n_scopes)
+            block = np.asarray(cube.values[:, start:stop, :])
+            prices = block.transpose(2, 1, 0).reshape(n_regions * (stop - start), n_vendors)
+            frame = analysis_frame(
+                np.repeat(cube.regions.to_numpy(), stop - start), np.tile(scopes[start:stop], n_regions),
+                prices, vendors, cube.scope_col,
+            )
+            frame = analysis_transposed(frame, cube.scope_col)
+            frame.index = pd.RangeIndex(start * n_regions, stop * n_regions)
+            yield frame
+
+    def iter_merge(self):
+        # Merge Data one spilled chunk at a time, each vendor's TOTAL row after
+        # its last chunk; concatenated this is engine.merge_data of the tender
+        seen = [0] * len(self.vendors)
+        sums = np.zeros((len(self.vendors), len(self.regions)))
+        vendor_codes = {vendor: v for v, vendor in enumerate(self.vendors)}
+        offset = 0
+        for batch in self._batches():
+            frame = batch.to_pandas()
+            v = vendor_codes[frame[VENDOR_COL].iat[0]]
+            seen[v] += len(frame)
+            sums[v] += np.nansum(frame[self.regions].to_numpy(dtype=float), axis=0)
+            if seen[v] == self.n_rows[v]:
+                total = {VENDOR_COL: self.vendors[v]}
+                for c, col in enumerate(self.labels):
+                    total[col] = TOTAL_LABEL if c == 0 else ""
+                total.update(zip(self.regions, sums[v]))
+                frame = pd.concat([frame, pd.DataFrame([total])], ignore_index=True)
+            frame[TOTAL_LABEL] = np.nansum(frame[self.regions].to_numpy(dtype=float), axis=1)
+            frame.index = pd.RangeIndex(offset, offset + len(frame))
+            offset += len(frame)
+            yield frame
+
+    def merge(self):
+        # the whole Merge Data table, materialised on demand
+        return pd.concat(self.iter_merge())
+
+    def tender(self):
+        # what read_tender returns for the workbook, read back from the spill
+        frames = [batch.to_pandas() for batch in self._batches()]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[VENDOR_COL])
+
+    # ----- cleanup -----
+    def close(self):
+        if self._writer is not None and self.cube is None:
+            self._writer.close()
+            self._sink.close()
+        self.cube = None
+        self._cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@profiled("ingest")
+def stream_tender(source, chunk_rows=CHUNK_ROWS, directory=SPILL_DIR):
+    # source: path, file-like or bytes -> finished StreamingTender. Sheets are
+    # read one at a time through openpyxl's read-only row iterator.
+    tender = StreamingTender(chunk_rows, directory)
+    try:
+        for sheet, rows in iter_sheets(source):
+            tender.add_sheet(sheet, rows)
+        return tender.finish()
+    except BaseException:
+        tender.close()
+        raise
@@ -0,0 +1,81 @@
+import argparse
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+import ingest
+
+SCOPE_HEADER = "SCOPE TOTAL PRICE (IDR)"
+
+
+def make_prices(n_vendors=40, n_scopes=5000, n_regions=10, zero_rate=0.05, seed=0):
+    # (vendor, scope, region) bids in whole thousands of Rupiah; zero_rate of
+    # the cells are 0 (vendor tidak ikut tender)
+    rng = np.random.default_rng(seed)
+    prices = rng.integers(100, 5000, size=(n_vendors, n_scopes, n_regions)) * 1000.0
+    prices[rng.random(prices.shape) < zero_rate] = 0
+    return prices
+
+
+def _labels(n_vendors, n_scopes, n_regions):
+    return (
+        [f"VENDOR {i + 1}" for i in range(n_vendors)],
+        [f"Scope {i + 1}" for i in range(n_scopes)],
+        [f"REGION {i + 1}" for i in range(n_regions)],
+    )
+
+
+def make_tender(n_vendors=40, n_scopes=5000, n_regions=10, zero_rate=0.05, seed=0):
+    # What read_tender returns for such a workbook, without the .xlsx round trip
+    prices = make_prices(n_vendors, n_scopes, n_regions, zero_rate, seed)
+    vendors, scopes, regions = _labels(n_vendors, n_scopes, n_regions)
+    scopes = pd.Series(scopes, dtype=object)
+    sheets = {}
+    for v, vendor in enumerate(vendors):
+        sheet = pd.DataFrame(prices[v], columns=regions)
+        sheet.insert(0, SCOPE_HEADER, scopes)
+        sheets[vendor] = sheet
+    return ingest.stack_sheets(sheets)
+
+
+def make_workbook(n_vendors=40, n_scopes=5000, n_regions=10, zero_rate=0.05, floating=True, seed=0):
+    # Vendor upload as .xlsx bytes: one sheet per vendor. With floating=True
+    # every table starts at a random cell (like B2 in the dummy dataset,
+    # further out for some vendors), otherwise at A1.
+    prices = make_prices(n_vendors, n_scopes, n_regions, zero_rate, seed)
+    vendors, scopes, regions = _labels(n_vendors, n_scopes, n_regions)
+    offsets = np.random.default_rng(seed + 1).integers(0, 6, size=(n_vendors, 2))
+    if not floating:
+        offsets[:] = 0
+
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+    for v, vendor in enumerate(vendors):
+        ws = workbook.add_worksheet(vendor)
+        row, col = (int(x) for x in offsets[v])
+        ws.write_row(row, col, [SCOPE_HEADER] + regions)
+        ws.write_column(row + 1, col, scopes)
+        for r in range(n_regions):
+            ws.write_column(row + 1, col + 1 + r, prices[v, :, r].tolist())
+    workbook.close()
+    return output.getvalue()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic tender workbook")
+    parser.add_argument("output")
+    parser.add_argument("--vendors", type=int, default=40)
+    parser.add_argument("--scopes", type=int, default=5000)
+    parser.add_argument("--regions", type=int, default=10)
+    parser.add_argument("--zero-rate", type=float, default=0.05, help="share of 0 (did not bid) cells")
+    parser.add_argument("--no-floating", action="store_true", help="put every table at A1")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = make_workbook(args.vendors, args.scopes, args.regions, args.zero_rate, not args.no_floating, args.seed)
+    with open(args.output, "wb") as f:
+        f.write(data)
+    print(f"{args.output}: {args.vendors} vendors x {args.scopes:,} scopes x {args.regions} regions, "
+          f"{len(data) / 1e6:.1f} MB")
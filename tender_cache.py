@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from disk_cache import DiskCache
+from engine import TenderViews
+from ingest import read_tender
+
+# Parsed uploads kept per server process, shared by every session
+CACHE_ENTRIES = int(os.environ.get("TCO_CACHE_ENTRIES", 8))
+
+
+def content_hash(data):
+    # Same workbook bytes -> same key, whatever the file is called
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class TenderCache:
+    # LRU of TenderViews keyed by content hash. A TenderViews builds the long
+    # table, cube and derived frames on first use, so a hit also reuses
+    # everything other sessions already computed for that workbook.
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, load):
+        with self._lock:
+            views = self._entries.get(key)
+            if views is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return views
+            self.misses += 1
+
+        # parse outside the lock so other sessions are not blocked meanwhile
+        views = load()
+        with self._lock:
+            views = self._entries.setdefault(key, views)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return views
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@st.cache_resource(show_spinner=False)
+def tender_cache():
+    return TenderCache()
+
+
+@st.cache_resource(show_spinner=False)
+def disk_cache():
+    return DiskCache()
+
+
+def load_tender(uploaded):
+    # uploaded: st.file_uploader result (or bytes) -> TenderViews of that workbook
+    data = uploaded.getvalue() if hasattr(uploaded, "getvalue") else bytes(uploaded)
+    name = getattr(uploaded, "name", "")
+    key = content_hash(data)
+
+    def load():
+        # parsed before (maybe by an earlier server process): skip Excel entirely
+        disk = disk_cache()
+        tender = disk.load(key) if disk.max_bytes else None
+        if tender is not None:
+            return TenderViews(tender)
+
+        # keep the name so legacy .xls still goes through pandas
+        source = data
+        if str(name).lower().endswith(".xls"):
+            source = uploaded
+            source.seek(0)
+        views = TenderViews(read_tender(source))
+        if disk.max_bytes:
+            try:
+                disk.store(key, views.tender)
+            except OSError:
+                pass   # read-only or full disk: the in-memory cache still works
+        return views
+
+    return tender_cache().get(key, load)